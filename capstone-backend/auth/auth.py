@@ -2,17 +2,18 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt import PyJWTError, encode, decode
 from datetime import datetime, timedelta
+import time
 from database.db import get_db
 from database.models import User
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from auth.principal_cache import principal_cache
+from services.metrics import stage
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 # Configuration
 SECRET_KEY = "your-secret-key"  # Replace with a strong, random key
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/admin/admin/token")  # Matches frontend
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -24,14 +25,15 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with stage("jwt_decode"):
+            payload = decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         role: str = payload.get("role")  # Extract role
         if username is None or role is None:
@@ -42,10 +44,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except PyJWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
-    if user is None or user.role != role:  # Ensure role matches
-        raise credentials_exception
-    return user
+    with stage("user_lookup"):
+        key = (username, role, expire)
+        columns = principal_cache.get(key)
+        if columns is not None:
+            # Attach the cached snapshot to this session without a SELECT
+            cached = User(**columns)
+            make_transient_to_detached(cached)
+            return db.merge(cached, load=False)
+
+        user = db.query(User).filter(User.username == username).first()
+        if user is None or user.role != role:  # Ensure role matches
+            raise credentials_exception
+        principal_cache.put(key, user, expire - time.time() if expire else None)
+        return user
 
 def get_current_user_role(current_user: User = Depends(get_current_user)):
     if not current_user.role:
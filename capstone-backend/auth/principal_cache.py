@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import inspect
+
+# Maximum number of cached principals; 0 disables the cache
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+# Seconds a cached principal is trusted before the users table is consulted again.
+# Deletes in this process invalidate immediately; other workers converge within the TTL.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "30"))
+
+
+class PrincipalCache:
+    """
+    Thread-safe LRU of authenticated users keyed by (username, role, token expiry).
+
+    Entries hold a snapshot of the user's column values rather than the ORM
+    instance, because the instance belongs to the request session that loaded
+    it and is expired by that session's commits.
+    """
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (username, role, exp) -> (columns, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple):
+        """Column snapshot for ``key``, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, user, token_expires_at: float = None):
+        """
+        Cache ``user`` under ``key``.
+
+        Args:
+            key (tuple): (username, role, exp) from the verified token.
+            user (User): The freshly loaded user.
+            token_expires_at (float): Seconds until the token expires; the entry never outlives it.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        lifetime = self.ttl if token_expires_at is None else min(self.ttl, token_expires_at)
+        if lifetime <= 0:
+            return
+        columns = {attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs}
+        with self._lock:
+            self._entries[key] = (columns, time.monotonic() + lifetime)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """Drop every cached token for ``username``; call after deleting the user or changing their role."""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == username]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,116 @@
+"""
+Mixed-traffic load test against a running API server.
+
+Logs in as a doctor and fires a weighted mix of type-ahead searches,
+alternative lookups, appointment views and health checks from many threads
+at once, then reports latency percentiles per route. A handler that blocks
+the event loop shows up here as a p99 blow-up on the cheap routes.
+
+    uvicorn main:app --workers 1 &
+    python -m benchmarks.mixed_load --username dr_smith --password secret --concurrency 32 --duration 30
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from benchmarks.stats import summarize
+
+SEARCH_TERMS = ["a", "ac", "asp", "met", "ibu", "par", "ator", "cill", "pril", "olol"]
+ALTERNATIVE_DRUGS = ["ASPIRIN", "METFORMIN", "IBUPROFEN", "HUMIRA", "ENBREL"]
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    request = urllib.request.Request(f"{base_url}/admin/admin/token", data=body, method="POST")
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def build_mix(base_url: str, token: str) -> list:
+    """(route label, weight, request factory) triples."""
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    def post(path, payload):
+        return lambda: urllib.request.Request(
+            f"{base_url}{path}", data=json.dumps(payload()).encode(), headers=headers, method="POST")
+
+    def get(path, auth=True):
+        return lambda: urllib.request.Request(f"{base_url}{path}", headers=headers if auth else {})
+
+    return [
+        ("POST /doctor/doctor/search", 60, post("/doctor/doctor/search", lambda: {"query": random.choice(SEARCH_TERMS)})),
+        ("POST /doctor/doctor/alternatives", 10, post("/doctor/doctor/alternatives", lambda: {"drugname": random.choice(ALTERNATIVE_DRUGS)})),
+        ("GET /doctor/doctor/appointments", 20, get("/doctor/doctor/appointments")),
+        ("GET /", 10, get("/", auth=False)),
+    ]
+
+
+def run(base_url: str, token: str, concurrency: int, duration: float) -> dict:
+    mix = build_mix(base_url, token)
+    labels = [label for label, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    factories = {label: factory for label, _, factory in mix}
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            label = random.choices(labels, weights)[0]
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(factories[label](), timeout=60) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except OSError:
+                status = "error"
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[label].append(elapsed)
+                statuses[label][str(status)] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "duration_seconds": duration,
+        "throughput_rps": round(len(all_latencies) / duration, 1),
+        "overall": summarize(all_latencies),
+        "routes": {label: {**summarize(values), "statuses": dict(statuses[label])} for label, values in latencies.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True, help="A doctor account")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of load")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    results = run(args.base_url, token, args.concurrency, args.duration)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+"""
+Offline benchmark suite for the inference, search, flagging, upload and appointment hot paths.
+
+Generates a seeded synthetic FAERS-like dataset, points the app at it and at a
+scratch SQLite database (nothing in drugs.db or models/df_clean.csv is
+touched), then times each path and records latency percentiles and peak
+Python memory. Run from the backend directory:
+
+    python -m benchmarks.suite --rows 20000 --output bench.json
+    python -m benchmarks.suite --output new.json --compare bench.json
+
+Endpoints are driven in-process through FastAPI's TestClient with
+authentication stubbed out, so the numbers are handler cost without network
+or bcrypt.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timedelta
+
+from benchmarks.stats import summarize
+
+DEFAULT_UPLOAD_SIZES = [1000, 10000, 100000]
+# A p50 or p95 this many times the baseline's is reported as a regression
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+# Calls measure() makes on top of ``iterations``: its warm-up plus the one traced for memory
+WARMUP_CALLS = 3
+EXTRA_CALLS = WARMUP_CALLS + 1
+
+
+def measure(fn, iterations: int, warmup: int = WARMUP_CALLS) -> dict:
+    """
+    Latency percentiles of ``fn(i)`` over ``iterations`` calls, plus the peak memory of one extra traced call.
+
+    Memory is traced separately because tracemalloc slows allocation-heavy code
+    enough to distort the timings.
+    """
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {**summarize(latencies), "peak_mem_mb": round(peak / 2 ** 20, 3)}
+
+
+def prepare_environment(workdir: str, rows: int, seed: int):
+    """Write the synthetic dataset and point DATABASE_URL / DF_CLEAN_PATH at scratch copies."""
+    from benchmarks.synthetic import SyntheticFaers
+
+    generator = SyntheticFaers(seed=seed)
+    dataset_path = os.path.join(workdir, "df_clean.csv")
+    generator.dataset(rows).to_csv(dataset_path, index=False)
+    os.environ["DF_CLEAN_PATH"] = dataset_path
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["WARM_UP_ON_STARTUP"] = "0"
+    return generator
+
+
+def bench_inference(generator, iterations: int) -> dict:
+    from services.prediction_cache import prediction_cache
+    from services.prediction_service import preprocess_input, preprocess_inputs, predict_risk_level, predict_risk_levels
+
+    records = generator.feature_records(max(iterations + 10, 1000))
+    batch = records[:1000]
+
+    def predict_uncached(i):
+        prediction_cache.clear()
+        predict_risk_level(records[i % len(records)])
+
+    def predict_batch_uncached(i):
+        prediction_cache.clear()
+        predict_risk_levels(batch)
+
+    return {
+        "preprocess_input": measure(lambda i: preprocess_input(records[i % len(records)]), iterations),
+        "preprocess_inputs_batch_1000": measure(lambda i: preprocess_inputs(batch), max(iterations // 20, 5)),
+        "predict_risk_level_uncached": measure(predict_uncached, iterations),
+        "predict_risk_level_cached": measure(lambda i: predict_risk_level(records[0]), iterations),
+        "predict_risk_levels_batch_1000_uncached": measure(predict_batch_uncached, max(iterations // 20, 5)),
+    }
+
+
+def bench_inference_pool(generator, process_counts: list, rows: int = 20000) -> dict:
+    """Throughput of scoring one large uncached batch in-process and across pools of each size."""
+    from services.inference_pool import InferencePool
+    from services.model_registry import model_registry
+
+    records = generator.feature_records(rows)
+    artifacts = model_registry.get()
+    model_dir = model_registry.version_dir(artifacts.version)
+
+    def timed(name, predict):
+        start = time.perf_counter()
+        predict()
+        elapsed = time.perf_counter() - start
+        return {name: {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1),
+                       "peak_mem_mb": 0.0}}
+
+    results = timed("score_batch_in_process", lambda: artifacts.model.predict(artifacts.pipeline.transform(records)))
+    for processes in process_counts:
+        pool = InferencePool(processes=processes, min_rows=0)
+        try:
+            pool.start(artifacts, model_dir)  # Child start-up is not part of the steady-state number
+            results.update(timed(f"score_batch_pool_{processes}", lambda: pool.predict(artifacts, model_dir, records)))
+        finally:
+            pool.shutdown()
+    return results
+
+
+def bench_alternatives(iterations: int) -> dict:
+    from services.dataset import get_dataset
+    from services.prediction_service import recommend_alternatives
+
+    df = get_dataset()
+    high_risk = df.loc[df['risk_level'] == 'high', 'drugname'].drop_duplicates().tolist()
+    with contextlib.redirect_stdout(io.StringIO()):  # recommend_alternatives logs every lookup
+        return {
+            "recommend_alternatives": measure(lambda i: recommend_alternatives(high_risk[i % len(high_risk)]), iterations),
+        }
+
+
+def bench_endpoints(client, generator, iterations: int, appointment_count: int) -> dict:
+    from auth.auth import get_current_user
+    from database.db import SessionLocal
+    from database.models import Patient, User
+    from main import app
+    from services.dataset import get_dataset
+
+    df = get_dataset()
+    names = df['drugname'].drop_duplicates().tolist()
+    rng = generator.rng
+    queries = []
+    for name in rng.choice(names, size=iterations + 10):
+        lowered = name.lower()
+        if rng.random() < 0.5:
+            queries.append(lowered[:rng.integers(2, 7)])  # Type-ahead prefix
+        else:
+            start = rng.integers(1, max(len(lowered) - 3, 2))
+            queries.append(lowered[start:start + 3])  # Infix fragment
+
+    db = SessionLocal()
+    doctors = [User(username=f"bench_doctor_{i}", role="doctor", name="Doctor", email=f"bench_doctor_{i}@example.com")
+               for i in range(20)]
+    db.add_all(doctors)
+    db.flush()
+    patients = [User(username=f"bench_patient_{i}", role="patient", name="Patient", email=f"bench_patient_{i}@example.com")
+                for i in range(appointment_count)]
+    db.add_all(patients)
+    db.flush()
+    midnight = datetime.combine(datetime.now().date(), datetime.min.time())
+    offsets = generator.appointment_offsets(appointment_count, days=7)
+    db.add_all([
+        Patient(user_id=patient.id, appointment_date=midnight + timedelta(minutes=int(offset)),
+                doctor_id=doctors[i % len(doctors)].id, is_profile_complete=True, is_handled=False)
+        for i, (patient, offset) in enumerate(zip(patients, offsets))
+    ])
+    db.commit()
+    doctor_id = doctors[0].id
+    db.close()
+
+    def as_role(role, user_id=1):
+        app.dependency_overrides[get_current_user] = lambda: User(id=user_id, role=role, username=f"bench_{role}")
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        assert response.status_code < 500, response.text
+
+    def walk_pages(path):
+        cursor = None
+        while True:
+            response = client.get(path, params={"limit": 200, **({"cursor": cursor} if cursor else {})})
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return
+
+    results = {}
+    as_role("doctor")
+    results["doctor_search"] = measure(lambda i: post("/doctor/doctor/search", {"query": queries[i % len(queries)]}), iterations)
+    as_role("production")
+    results["production_search"] = measure(
+        lambda i: post("/production/production/production/search", {"query": queries[i % len(queries)]}), iterations)
+
+    # Every name can be flagged only once, so each call takes fresh names and the counts leave
+    # room for measure()'s extra calls; benchmarks the dataset is too small for are left out
+    flag_pool = names[:min(iterations + EXTRA_CALLS, len(names) // 3)]
+    batches = [names[start:start + 100] for start in range(len(flag_pool), len(names) - 99, 100)]
+    flag_names, batch_names = iter(flag_pool), iter(batches)
+    flag_iterations = min(iterations, len(flag_pool) - EXTRA_CALLS)
+    if flag_iterations > 0:
+        results["flag_drug"] = measure(
+            lambda i: post("/production/production/production/flag", {"drugname": next(flag_names)}), flag_iterations)
+    batch_iterations = min(max(iterations // 20, 5), len(batches) - EXTRA_CALLS)
+    if batch_iterations > 0:
+        results["flag_drugs_batch_100"] = measure(
+            lambda i: post("/production/production/production/flag/batch", {"drugnames": next(batch_names)}),
+            batch_iterations)
+
+    as_role("nurse")
+    results["nurse_appointments_first_page"] = measure(
+        lambda i: client.get("/nurse/nurse/appointments", params={"limit": 200}), iterations)
+    results["nurse_appointments_all_pages"] = measure(
+        lambda i: walk_pages("/nurse/nurse/appointments"), max(iterations // 20, 5))
+    as_role("doctor", doctor_id)
+    results["doctor_appointments"] = measure(lambda i: client.get("/doctor/doctor/appointments"), iterations)
+    app.dependency_overrides.clear()
+    return results
+
+
+def bench_bulk_upload(generator, workdir: str, sizes: list) -> dict:
+    from database.db import SessionLocal
+    from services.bulk_upload import run_bulk_upload
+
+    def upload(path):
+        db = SessionLocal()
+        try:
+            with open(path, "rb") as f:
+                return run_bulk_upload(db, f, os.path.basename(path))
+        finally:
+            db.close()
+
+    results = {}
+    for size in sizes:
+        paths = []
+        for run in ("timed", "traced"):
+            path = os.path.join(workdir, f"upload_{size}_{run}.csv")
+            generator.upload_sheet(size, prefix=f"BENCH{size}{run.upper()}").to_csv(path, index=False)
+            paths.append(path)
+
+        start = time.perf_counter()
+        summary = upload(paths[0])
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        upload(paths[1])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"bulk_upload_{size}"] = {
+            "rows": size,
+            "added": summary["added"],
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(size / elapsed, 1),
+            "peak_mem_mb": round(peak / 2 ** 20, 3),
+        }
+    return results
+
+
+def metadata(args) -> dict:
+    import pandas as pd
+    import sklearn
+    from services.model_registry import model_registry
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "scikit_learn": sklearn.__version__,
+        "model_version": model_registry.active_version,
+        "dataset_rows": args.rows,
+        "iterations": args.iterations,
+        "seed": args.seed,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Lines describing how each benchmark moved against ``baseline``; regressions are marked."""
+    lines = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous:
+            continue
+        for metric in ("p50_ms", "p95_ms", "seconds", "peak_mem_mb"):
+            if metric in current and previous.get(metric):
+                ratio = current[metric] / previous[metric]
+                flag = "REGRESSION" if metric != "peak_mem_mb" and ratio > threshold else ""
+                lines.append(f"{name:45s} {metric:12s} {previous[metric]:>12} -> {current[metric]:>12}  x{ratio:5.2f} {flag}")
+    return lines
+
+
+def print_table(benchmarks: dict):
+    print(f"{'benchmark':45s} {'count':>7s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'peak MB':>9s}")
+    for name, result in benchmarks.items():
+        if "seconds" in result:
+            print(f"{name:45s} {result['rows']:>7d} {result['seconds'] * 1000:>10.1f} {'':>10s} {'':>10s} "
+                  f"{result['peak_mem_mb']:>9.2f}  ({result['rows_per_second']} rows/s)")
+        else:
+            print(f"{name:45s} {result['count']:>7d} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+                  f"{result['p99_ms']:>10.3f} {result['peak_mem_mb']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Synthetic dataset size")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per latency benchmark")
+    parser.add_argument("--upload-sizes", type=int, nargs="*", default=DEFAULT_UPLOAD_SIZES)
+    parser.add_argument("--appointments", type=int, default=5000, help="Appointments seeded for the views")
+    parser.add_argument("--pool-processes", type=int, nargs="*", default=sorted({1, os.cpu_count() or 1}),
+                        help="Inference pool sizes to time; pass none to skip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", module="sklearn")
+    with tempfile.TemporaryDirectory(prefix="drug-bench-") as workdir:
+        generator = prepare_environment(workdir, args.rows, args.seed)
+
+        from fastapi.testclient import TestClient
+        from database.db import Base, engine
+        from main import app
+        from services.prediction_service import warm_up
+
+        Base.metadata.create_all(bind=engine)
+        load_start = time.perf_counter()
+        warm_up()
+        benchmarks = {"warm_up": {"count": 1, "seconds": round(time.perf_counter() - load_start, 3)}}
+
+        benchmarks.update(bench_inference(generator, args.iterations))
+        if args.pool_processes:
+            benchmarks.update(bench_inference_pool(generator, args.pool_processes))
+        benchmarks.update(bench_alternatives(args.iterations))
+        with TestClient(app) as client:
+            benchmarks.update(bench_endpoints(client, generator, args.iterations, args.appointments))
+        benchmarks.update(bench_bulk_upload(generator, workdir, args.upload_sizes))
+        engine.dispose()
+
+    results = {
+        "meta": {**metadata(args), "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)},
+        "benchmarks": benchmarks,
+    }
+    print_table({name: result for name, result in benchmarks.items() if name != "warm_up"})
+    print(f"warm_up: {benchmarks['warm_up']['seconds']} s, max RSS {results['meta']['max_rss_mb']} MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines = compare(results, baseline, args.threshold)
+        print("\n".join(lines))
+        if any(line.endswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
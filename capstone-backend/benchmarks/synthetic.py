@@ -0,0 +1,97 @@
+"""
+Synthetic FAERS-like data for offline benchmarks.
+
+Categorical values are drawn from the fitted encoders and symptom terms from
+the TF-IDF vocabulary in ``models/``, so generated rows exercise the same
+feature pipeline code paths as real reports. Frequencies are skewed (a few
+drugs and routes dominate) like the real dataset. Everything is seeded, so a
+given size always produces the same data.
+"""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from services.utils import MODELS_DIR, ENCODERS_FILE, TFIDF_FILE
+
+DATASET_COLUMNS = [
+    "drugname", "prod_ai", "pt", "route", "dose_amt", "nda_num", "dose_unit", "dose_form",
+    "dose_freq", "dechal", "rechal", "role_cod", "outc_cod", "risk_level",
+]
+ROLE_CODES = ["PS", "SS", "C", "I"]
+OUTCOME_CODES = ["OT", "HO", "DE", "LT", "DS", "RI", "CA"]
+FALLBACK_VALUES = ["Unknown"]
+
+
+class SyntheticFaers:
+    """Seeded generator of dataset rows, upload sheets and appointment schedules."""
+
+    def __init__(self, seed: int = 0, model_dir: str = MODELS_DIR, drug_count: int = 3000):
+        self.rng = np.random.default_rng(seed)
+        encoders = joblib.load(os.path.join(model_dir, ENCODERS_FILE))
+        self.vocab = {col: [str(value) for value in encoder.classes_] for col, encoder in encoders.items()}
+        terms = sorted(joblib.load(os.path.join(model_dir, TFIDF_FILE)).vocabulary_)
+        self.symptoms = [term.upper() for term in terms]
+        self.drug_names = [f"DRUG{i:05d}{self._suffix(i)}" for i in range(drug_count)]
+
+    @staticmethod
+    def _suffix(i: int) -> str:
+        return ("ol", "ine", "am", "ex", "pril", "mab")[i % 6]
+
+    def _zipf_choice(self, values: list, size: int) -> np.ndarray:
+        # Rank-frequency skew: the first values are by far the most common, like real report data
+        weights = 1.0 / np.arange(1, len(values) + 1) ** 1.1
+        return np.asarray(values, dtype=object)[self.rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+    def _symptom_lists(self, size: int) -> list:
+        counts = self.rng.integers(1, 5, size=size)
+        picks = self._zipf_choice(self.symptoms, int(counts.sum()))
+        out, start = [], 0
+        for count in counts:
+            out.append(", ".join(dict.fromkeys(picks[start:start + count])))
+            start += count
+        return out
+
+    def dataset(self, rows: int) -> pd.DataFrame:
+        """A cleaned-dataset frame with the columns and dtypes of ``models/df_clean.csv``."""
+        names = self._zipf_choice(self.drug_names, rows)
+        # A drug's risk level is a property of the drug, as in the real data
+        drug_risk = {name: ("high" if self.rng.random() < 0.4 else "low") for name in self.drug_names}
+        frame = pd.DataFrame({
+            "drugname": names,
+            "prod_ai": [f"{name} ACTIVE" for name in names],
+            "pt": self._symptom_lists(rows),
+            "route": self._zipf_choice(self.vocab.get("route", FALLBACK_VALUES), rows),
+            "dose_amt": self.rng.integers(1, 1000, size=rows),
+            "nda_num": self.rng.integers(10000, 99999, size=rows),
+            "dose_unit": self._zipf_choice(self.vocab.get("dose_unit", FALLBACK_VALUES), rows),
+            "dose_form": self._zipf_choice(self.vocab.get("dose_form", FALLBACK_VALUES), rows),
+            "dose_freq": self._zipf_choice(self.vocab.get("dose_freq", FALLBACK_VALUES), rows),
+            "dechal": self._zipf_choice(self.vocab.get("dechal", FALLBACK_VALUES), rows),
+            "rechal": self._zipf_choice(self.vocab.get("rechal", FALLBACK_VALUES), rows),
+            "role_cod": self.rng.choice(ROLE_CODES, size=rows),
+            "outc_cod": self.rng.choice(OUTCOME_CODES, size=rows),
+            "risk_level": [drug_risk[name] for name in names],
+        })
+        return frame[DATASET_COLUMNS]
+
+    def feature_records(self, count: int) -> list:
+        """Prediction inputs as the routers build them."""
+        frame = self.dataset(count)
+        return [
+            {**row, "dose_amt": float(row["dose_amt"]), "nda_num": float(row["nda_num"])}
+            for row in frame.drop(columns=["risk_level"]).to_dict(orient="records")
+        ]
+
+    def upload_sheet(self, rows: int, prefix: str = "UPLOAD") -> pd.DataFrame:
+        """A bulk-upload sheet (template columns) with unique drug names."""
+        frame = self.dataset(rows).drop(columns=["risk_level"]).rename(columns={"drugname": "name"})
+        frame["name"] = [f"{prefix}{i:07d}" for i in range(rows)]
+        return frame
+
+    def appointment_offsets(self, count: int, days: int = 14) -> np.ndarray:
+        """Minutes after midnight today for ``count`` appointments spread over ``days`` days of clinic hours."""
+        day = self.rng.integers(0, days, size=count)
+        minute = self.rng.integers(9 * 60, 17 * 60, size=count)
+        return day * 24 * 60 + minute
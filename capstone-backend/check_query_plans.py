@@ -0,0 +1,92 @@
+"""
+Query plan audit for the hot lookup paths.
+
+Runs each query the busy endpoints issue against the configured SQLite
+database (DATABASE_URL), asks SQLite for its plan with EXPLAIN QUERY PLAN and
+fails if any of them scans a table without an index or sorts in a temp
+B-tree. Run after `alembic upgrade head` and whenever a query or index changes:
+
+    python check_query_plans.py
+"""
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from database.db import SessionLocal, engine
+from database.models import Drug, FlaggedDrug, Nurse, Patient, User
+from services.appointments import appointments_query
+from services.catalog import changes_since_query
+from services.pagination import encode_cursor
+
+TODAY = date.today()
+NEXT_WEEK = TODAY + timedelta(days=7)
+CURSOR = encode_cursor([f"{TODAY.isoformat()}T09:00:00", 1])
+
+# (label, callable issuing the query against a session)
+HOT_QUERIES = [
+    ("nurse appointments", lambda db: appointments_query(db, TODAY, NEXT_WEEK).limit(201).all()),
+    ("nurse appointments, next page", lambda db: appointments_query(db, TODAY, NEXT_WEEK, CURSOR).limit(201).all()),
+    ("doctor appointments", lambda db: appointments_query(db, TODAY, NEXT_WEEK, doctor_id=1).limit(201).all()),
+    ("doctor appointments, next page",
+     lambda db: appointments_query(db, TODAY, NEXT_WEEK, CURSOR, doctor_id=1).limit(201).all()),
+    ("login by username", lambda db: db.query(User).filter(User.username == "x").first()),
+    ("patient by user_id", lambda db: db.query(Patient).filter(Patient.user_id == 1).first()),
+    ("nurse by user_id", lambda db: db.query(Nurse).filter(Nurse.user_id == 1).first()),
+    ("drug by name", lambda db: db.query(Drug).filter(Drug.name == "ASPIRIN").first()),
+    ("flagged drug by name", lambda db: db.query(FlaggedDrug).filter(FlaggedDrug.drugname == "ASPIRIN").first()),
+    ("catalog changes since a version", lambda db: db.execute(changes_since_query(0)).all()),
+    ("same-route drugs by risk",
+     lambda db: db.query(Drug.name).filter(Drug.route == "ORAL", Drug.risk_level == "Low").all()),
+]
+
+
+def capture_statement(db, run) -> tuple:
+    """Execute ``run(db)`` and return the (sql, parameters) of the last statement it sent."""
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return captured[-1]
+
+
+def plan_problems(plan: list) -> list:
+    """Plan lines that mean a full table scan or an unindexed sort."""
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN") and " USING " not in detail:
+            problems.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+def main() -> int:
+    if engine.dialect.name != "sqlite":
+        print(f"EXPLAIN QUERY PLAN audit only supports SQLite (DATABASE_URL uses {engine.dialect.name})")
+        return 2
+    db = SessionLocal()
+    failures = 0
+    try:
+        for label, run in HOT_QUERIES:
+            statement, parameters = capture_statement(db, run)
+            plan = [row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            problems = plan_problems(plan)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok  '} {label}")
+            for detail in plan:
+                print(f"       {detail}")
+    finally:
+        db.close()
+    print(f"{failures} of {len(HOT_QUERIES)} hot queries are not index-backed" if failures else "All hot queries use an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
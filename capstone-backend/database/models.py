@@ -1,12 +1,9 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import relationship
 from database.db import Base
-import pandas as pd
-from passlib.context import CryptContext
 from sqlalchemy.sql.sqltypes import DateTime
 from datetime import datetime
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.password_service import password_service
 
 class Drug(Base):
     __tablename__ = "drugs"
@@ -25,6 +22,13 @@ class Drug(Base):
     rechal = Column(String)
     role_cod = Column(String)
     risk_level = Column(String)
+    model_version = Column(String)  # Registry version that produced risk_level
+    feature_hash = Column(String)  # feature_key() hex of the inputs risk_level was computed from
+    catalog_seq = Column(Integer, index=True)  # "drugs" table version of the last catalog-visible change
+
+    __table_args__ = (
+        Index("ix_drugs_route_risk_level", "route", "risk_level"),  # Same-route alternatives by risk
+    )
 
 class FlaggedDrug(Base):
     __tablename__ = "flagged_drugs"
@@ -32,9 +36,14 @@ class FlaggedDrug(Base):
     drugname = Column(String, unique=True, index=True)
     risk_level = Column(String)
     suppressed = Column(Boolean, default=False)
-    alternatives = Column(String)  # JSON string
+    alternatives = Column(JSON)  # List of alternative drug names
     hidden_by_manager = Column(Boolean, default=False)
 
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    name = Column(String, primary_key=True)  # Table whose contents are versioned, e.g. "flagged_drugs"
+    version = Column(Integer, nullable=False, default=0)  # Bumped in the same transaction as every write
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -51,7 +60,8 @@ class User(Base):
     created_by_id = Column(Integer, ForeignKey("users.id"))  # New field to link to creator
 
     def verify_password(self, password: str) -> bool:
-        return pwd_context.verify(password, self.password)
+        verified, _ = password_service.verify(password, self.password)
+        return verified
 
     nurse = relationship("Nurse", back_populates="user", uselist=False)
     patient = relationship("Patient", back_populates="user", uselist=False, foreign_keys="Patient.user_id")
@@ -78,15 +88,33 @@ class Patient(Base):
 
     user = relationship("User", back_populates="patient", foreign_keys=[user_id])
 
-# Load df_clean at the module level
-df_clean = None
-try:
-    df_clean = pd.read_csv("models/df_clean.csv")
-    if df_clean.empty:
-        raise ValueError("df_clean.csv is empty")
-    print("df_clean columns:", df_clean.columns.tolist())
-    print("df_clean head:", df_clean.head().to_string())
-except FileNotFoundError:
-    raise FileNotFoundError("models/df_clean.csv not found. Please ensure the file exists.")
-except Exception as e:
-    raise Exception(f"Error loading df_clean.csv: {str(e)}")
\ No newline at end of file
+    __table_args__ = (
+        # Keyset-ordered appointment views: hospital-wide (nurse) and per doctor
+        Index("ix_patients_appointment_date_id", "appointment_date", "id"),
+        Index("ix_patients_doctor_id_appointment_date", "doctor_id", "appointment_date", "id"),
+    )
+
+# Rows covered by uq_jobs_active_rescore
+ACTIVE_RESCORE_WHERE = "kind = 'rescore' AND status IN ('queued', 'running')"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(String, primary_key=True, index=True)  # uuid4 hex, returned to the client
+    kind = Column(String, index=True)  # "bulk_upload", "rescore", ...
+    status = Column(String, index=True, default="queued")  # "queued", "running", "completed", "failed"
+    created_by_id = Column(Integer, ForeignKey("users.id"))
+    total = Column(Integer)  # Expected number of items, if known up front
+    processed = Column(Integer, default=0)
+    result = Column(JSON)  # Job-specific summary once finished (or partial while running)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    owner = Column(String)  # "<host>:<pid>:<token>" of the worker process running the job
+    heartbeat_at = Column(DateTime)  # Refreshed by the owner while the job is queued/running
+
+    __table_args__ = (
+        # At most one queued/running re-scoring job; a second insert fails, however close the race
+        Index("uq_jobs_active_rescore", "kind", unique=True,
+              sqlite_where=text(ACTIVE_RESCORE_WHERE), postgresql_where=text(ACTIVE_RESCORE_WHERE)),
+    )
@@ -1,12 +1,47 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
+from auth.principal_cache import principal_cache
 from routers import doctor, admin, production, nurse, patient
+from services.catalog import drug_catalog
+from services.inference_batcher import inference_batcher
+from services.inference_pool import inference_pool
+from services.jobs import fail_interrupted_jobs, shutdown_jobs
+from services.metrics import metrics, MetricsMiddleware, CONTENT_TYPE
+from services.password_service import password_service, PasswordServiceBusy
+from services.prediction_cache import prediction_cache
+from services.prediction_service import warm_up, WARM_UP_ON_STARTUP
+
+# Handlers are plain `def` functions because the ORM session, bcrypt, pandas and the model
+# all block; FastAPI runs them on this worker thread pool so the event loop stays free.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Jobs run in-process: fail the ones a dead worker left queued/running; live siblings' jobs are kept
+    fail_interrupted_jobs()
+    if WARM_UP_ON_STARTUP:
+        # Model, dataset and indexes otherwise load lazily on the first request that needs them
+        warm_up()
+    yield
+    shutdown_jobs(wait=False)
+    password_service.shutdown()
+    inference_batcher.shutdown()
+    inference_pool.shutdown()
+
 
 app = FastAPI(
     title="Drug Risk Prediction API",
     description="API for classifying drug risk levels and suggesting alternatives",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS settings — allow frontend to call backend
@@ -21,7 +56,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# Outermost, so the recorded latency covers CORS and every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# Component counters exported alongside the request metrics on every scrape
+metrics.register_stats("prediction_cache", prediction_cache.stats)
+metrics.register_stats("principal_cache", principal_cache.stats)
+metrics.register_stats("inference_batcher", inference_batcher.stats)
+metrics.register_stats("inference_pool", inference_pool.stats)
+metrics.register_stats("password_service", password_service.stats)
+metrics.register_stats("catalog", drug_catalog.stats)
+
+@app.exception_handler(PasswordServiceBusy)
+def password_service_busy_handler(request: Request, exc: PasswordServiceBusy):
+    # Login/signup bursts are shed here instead of starving the rest of the API
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 # Include routers
 app.include_router(doctor.router, prefix="/doctor", tags=["Doctor"])
@@ -32,4 +83,8 @@ app.include_router(patient.router, prefix="/patient", tags=["Patient"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Drug Risk Prediction API is running."}
\ No newline at end of file
+    return {"message": "Drug Risk Prediction API is running."}
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""baseline schema
+
+Revision ID: 5b1d0c7e2a91
+Revises:
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1d0c7e2a91'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Databases created before Alembic was wired up already have these tables,
+    so each one is only created when missing.
+    """
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(), nullable=True),
+            sa.Column('password', sa.String(), nullable=True),
+            sa.Column('role', sa.String(), nullable=True),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('email', sa.String(), nullable=True),
+            sa.Column('phone', sa.String(), nullable=True),
+            sa.Column('department', sa.String(), nullable=True),
+            sa.Column('designation', sa.String(), nullable=True),
+            sa.Column('hospital', sa.String(), nullable=True),
+            sa.Column('city', sa.String(), nullable=True),
+            sa.Column('created_by_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['created_by_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_username', 'users', ['username'], unique=True)
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_role', 'users', ['role'])
+        op.create_index('ix_users_name', 'users', ['name'])
+
+    if 'drugs' not in existing:
+        op.create_table(
+            'drugs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('prod_ai', sa.String(), nullable=True),
+            sa.Column('pt', sa.String(), nullable=True),
+            sa.Column('outc_cod', sa.String(), nullable=True),
+            sa.Column('dose_amt', sa.Integer(), nullable=True),
+            sa.Column('nda_num', sa.Integer(), nullable=True),
+            sa.Column('route', sa.String(), nullable=True),
+            sa.Column('dose_unit', sa.String(), nullable=True),
+            sa.Column('dose_form', sa.String(), nullable=True),
+            sa.Column('dose_freq', sa.String(), nullable=True),
+            sa.Column('dechal', sa.String(), nullable=True),
+            sa.Column('rechal', sa.String(), nullable=True),
+            sa.Column('role_cod', sa.String(), nullable=True),
+            sa.Column('risk_level', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name'),
+        )
+        op.create_index('ix_drugs_id', 'drugs', ['id'])
+
+    if 'flagged_drugs' not in existing:
+        op.create_table(
+            'flagged_drugs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('drugname', sa.String(), nullable=True),
+            sa.Column('risk_level', sa.String(), nullable=True),
+            sa.Column('suppressed', sa.Boolean(), nullable=True),
+            sa.Column('alternatives', sa.String(), nullable=True),
+            sa.Column('hidden_by_manager', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_flagged_drugs_id', 'flagged_drugs', ['id'])
+        op.create_index('ix_flagged_drugs_drugname', 'flagged_drugs', ['drugname'], unique=True)
+
+    if 'nurses' not in existing:
+        op.create_table(
+            'nurses',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('shift_start', sa.DateTime(), nullable=True),
+            sa.Column('shift_end', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id'),
+        )
+        op.create_index('ix_nurses_id', 'nurses', ['id'])
+
+    if 'patients' not in existing:
+        op.create_table(
+            'patients',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('age', sa.Integer(), nullable=True),
+            sa.Column('address', sa.String(), nullable=True),
+            sa.Column('appointment_date', sa.DateTime(), nullable=True),
+            sa.Column('is_profile_complete', sa.Boolean(), nullable=True),
+            sa.Column('doctor_id', sa.Integer(), nullable=True),
+            sa.Column('is_handled', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['doctor_id'], ['users.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id'),
+        )
+        op.create_index('ix_patients_id', 'patients', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('patients')
+    op.drop_table('nurses')
+    op.drop_table('flagged_drugs')
+    op.drop_table('drugs')
+    op.drop_table('users')
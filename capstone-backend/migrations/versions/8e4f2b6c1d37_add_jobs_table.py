@@ -0,0 +1,49 @@
+"""add jobs table
+
+Revision ID: 8e4f2b6c1d37
+Revises: 5b1d0c7e2a91
+Create Date: 2026-10-18 10:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f2b6c1d37'
+down_revision: Union[str, Sequence[str], None] = '5b1d0c7e2a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('created_by_id', sa.Integer(), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('processed', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_jobs_id', 'jobs', ['id'])
+    op.create_index('ix_jobs_kind', 'jobs', ['kind'])
+    op.create_index('ix_jobs_status', 'jobs', ['status'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status', table_name='jobs')
+    op.drop_index('ix_jobs_kind', table_name='jobs')
+    op.drop_index('ix_jobs_id', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,31 @@
+"""add drugs.feature_hash
+
+Revision ID: a4d8e2c6f0b9
+Revises: f2a6d4c8b1e3
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d8e2c6f0b9'
+down_revision: Union[str, Sequence[str], None] = 'f2a6d4c8b1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep NULL, which the next re-scoring run treats as stale
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.add_column(sa.Column('feature_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.drop_column('feature_hash')
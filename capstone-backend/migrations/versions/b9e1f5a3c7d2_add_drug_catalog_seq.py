@@ -0,0 +1,37 @@
+"""add drugs.catalog_seq
+
+Revision ID: b9e1f5a3c7d2
+Revises: a4d8e2c6f0b9
+Create Date: 2026-10-18 19:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e1f5a3c7d2'
+down_revision: Union[str, Sequence[str], None] = 'a4d8e2c6f0b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows keep NULL; workers read every drug when they first load the catalog anyway
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.add_column(sa.Column('catalog_seq', sa.Integer(), nullable=True))
+    op.create_index('ix_drugs_catalog_seq', 'drugs', ['catalog_seq'])
+    # Seeded here so bump_table_version only ever UPDATEs; two first writers racing on the INSERT would collide
+    table_versions = sa.table('table_versions', sa.column('name', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(table_versions, [{'name': 'drugs', 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM table_versions WHERE name = 'drugs'")
+    op.drop_index('ix_drugs_catalog_seq', table_name='drugs')
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.drop_column('catalog_seq')
@@ -0,0 +1,30 @@
+"""add drugs.model_version
+
+Revision ID: c3a7d9e04f12
+Revises: 8e4f2b6c1d37
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a7d9e04f12'
+down_revision: Union[str, Sequence[str], None] = '8e4f2b6c1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.add_column(sa.Column('model_version', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('drugs') as batch_op:
+        batch_op.drop_column('model_version')
@@ -0,0 +1,33 @@
+"""add jobs.owner and jobs.heartbeat_at
+
+Revision ID: c6f2a8d4e1b7
+Revises: b9e1f5a3c7d2
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a8d4e1b7'
+down_revision: Union[str, Sequence[str], None] = 'b9e1f5a3c7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Active jobs from before this revision have no heartbeat and are treated as abandoned
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('owner')
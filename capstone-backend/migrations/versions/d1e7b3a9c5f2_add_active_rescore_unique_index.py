@@ -0,0 +1,39 @@
+"""add a unique index allowing one active re-scoring job
+
+Revision ID: d1e7b3a9c5f2
+Revises: c6f2a8d4e1b7
+Create Date: 2026-10-19 11:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1e7b3a9c5f2'
+down_revision: Union[str, Sequence[str], None] = 'c6f2a8d4e1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_RESCORE_WHERE = "kind = 'rescore' AND status IN ('queued', 'running')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest active re-scoring job so the index can be built
+    op.execute(
+        "UPDATE jobs SET status = 'failed', error = 'Superseded by a newer re-scoring job' "
+        f"WHERE {ACTIVE_RESCORE_WHERE} AND id NOT IN ("
+        f"SELECT id FROM jobs WHERE {ACTIVE_RESCORE_WHERE} ORDER BY created_at DESC LIMIT 1)"
+    )
+    op.create_index(
+        'uq_jobs_active_rescore', 'jobs', ['kind'], unique=True,
+        sqlite_where=sa.text(ACTIVE_RESCORE_WHERE), postgresql_where=sa.text(ACTIVE_RESCORE_WHERE),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_jobs_active_rescore', table_name='jobs')
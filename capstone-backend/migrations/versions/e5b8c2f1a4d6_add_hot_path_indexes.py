@@ -0,0 +1,31 @@
+"""add indexes for appointment views and same-route drug lookups
+
+Revision ID: e5b8c2f1a4d6
+Revises: c3a7d9e04f12
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c2f1a4d6'
+down_revision: Union[str, Sequence[str], None] = 'c3a7d9e04f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_patients_appointment_date_id', 'patients', ['appointment_date', 'id'])
+    op.create_index('ix_patients_doctor_id_appointment_date', 'patients', ['doctor_id', 'appointment_date', 'id'])
+    op.create_index('ix_drugs_route_risk_level', 'drugs', ['route', 'risk_level'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_drugs_route_risk_level', table_name='drugs')
+    op.drop_index('ix_patients_doctor_id_appointment_date', table_name='patients')
+    op.drop_index('ix_patients_appointment_date_id', table_name='patients')
@@ -0,0 +1,67 @@
+"""store flagged_drugs.alternatives as JSON and add table_versions
+
+Revision ID: f2a6d4c8b1e3
+Revises: e5b8c2f1a4d6
+Create Date: 2026-10-18 15:10:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a6d4c8b1e3'
+down_revision: Union[str, Sequence[str], None] = 'e5b8c2f1a4d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+flagged_drugs = sa.table(
+    'flagged_drugs',
+    sa.column('id', sa.Integer),
+    sa.column('alternatives', sa.String),
+)
+
+
+def _normalize_alternatives(bind):
+    """Rewrite every row as a JSON list; values that never parsed become a one-item list or []."""
+    for row_id, raw in bind.execute(sa.select(flagged_drugs.c.id, flagged_drugs.c.alternatives)).fetchall():
+        try:
+            value = json.loads(raw) if raw else []
+        except ValueError:
+            value = [raw]
+        if not isinstance(value, list):
+            value = [value]
+        normalized = json.dumps(value)
+        if normalized != raw:
+            bind.execute(flagged_drugs.update().where(flagged_drugs.c.id == row_id).values(alternatives=normalized))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    _normalize_alternatives(bind)
+    with op.batch_alter_table('flagged_drugs') as batch_op:
+        batch_op.alter_column(
+            'alternatives', type_=sa.JSON(), existing_type=sa.String(),
+            postgresql_using='alternatives::json'
+        )
+
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('name', sa.String(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+    )
+    op.bulk_insert(table_versions, [{'name': 'flagged_drugs', 'version': 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
+    with op.batch_alter_table('flagged_drugs') as batch_op:
+        batch_op.alter_column(
+            'alternatives', type_=sa.String(), existing_type=sa.JSON(),
+            postgresql_using='alternatives::text'
+        )
@@ -0,0 +1,40 @@
+"""
+Re-score stored drugs against the active model version.
+
+Only drugs whose stored model version or feature hash is out of date are
+scored and updated, a chunk per transaction, so this is safe to interrupt
+and re-run. Run after `alembic upgrade head` and whenever a new model
+version is activated (POST /admin/admin/rescore does the same as a
+background job):
+
+    python rescore_drugs.py
+    python rescore_drugs.py --start-after 120000   # skip ids an interrupted run already covered
+"""
+import argparse
+import time
+
+from database.db import SessionLocal
+from services.rescoring import RESCORE_CHUNK_SIZE, rescore_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start-after", type=int, default=0, help="Only look at drugs with a larger id")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        summary = rescore_catalog(
+            db, args.start_after, args.chunk_size,
+            on_chunk=lambda s: print(f"up to id {s['last_id']}: {s['scanned']} scanned, {s['rescored']} rescored"),
+        )
+    finally:
+        db.close()
+    print(f"done in {time.perf_counter() - start:.1f} s: {summary['scanned']} scanned, {summary['rescored']} rescored, "
+          f"{summary['changed']} changed risk level, model versions {summary['model_versions'] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,39 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 
 from schemas.request_schemas import DeleteDoctorRequest
-from services.prediction_service import predict_risk_level, df_clean
+from schemas.response_schemas import JobSubmittedResponse, JobStatusResponse, JobProgressResponse
+from services.bulk_upload import bulk_upload_job, SUPPORTED_EXTENSIONS
+from services.catalog import drug_catalog, next_catalog_seq
+from services.jobs import submit_job, get_job
+from services.model_registry import model_registry, model_load_job
+from services.password_service import password_service
+from services.prediction_cache import prediction_cache, feature_key
+from services.inference_batcher import inference_batcher
+from services.inference_pool import inference_pool
+from services.rescoring import RESCORE_JOB_KIND, active_rescore_job, rescore_job, resume_point
+from services.table_versions import etag_matches
+from services.upload_template import get_upload_template
 from database.models import Drug, User, Nurse
 from database.db import get_db
-import pandas as pd
 import shutil
 import os
-from passlib.context import CryptContext
+import tempfile
 from auth.auth import create_access_token, get_current_user, get_current_user_role
+from auth.principal_cache import principal_cache
 from datetime import timedelta
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Login and signup are async so that while bcrypt runs they hold no request thread; only the queries take one
 @router.post("/token")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not user.verify_password(form_data.password):
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.username == form_data.username).first())
+    if not user or not await password_service.verify_user_async(db, user, form_data.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -46,15 +58,17 @@ async def signup_admin(
     city: str = Form(None),
     db: Session = Depends(get_db)
 ):
-    existing_admin = db.query(User).filter(User.role == "admin").first()
+    existing_admin = await run_in_threadpool(lambda: db.query(User).filter(User.role == "admin").first())
     if existing_admin:
         raise HTTPException(status_code=403, detail="An admin user already exists. Use /admin/token to log in.")
 
-    existing_user = db.query(User).filter((User.username == username) | (User.email == email)).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter((User.username == username) | (User.email == email)).first()
+    )
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
-    hashed_password = pwd_context.hash(password)
+    hashed_password = await password_service.hash_async(password)
 
     new_admin = User(
         username=username,
@@ -70,14 +84,13 @@ async def signup_admin(
     )
 
     db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
+    await run_in_threadpool(db.commit)
 
     return {"message": "Admin user created successfully. Use /admin/token to log in."}
 
 @router.post("/add-doctor")
 @router.post("/add-nurse")
-async def add_user(
+def add_user(
     username: str = Form(...),
     password: str = Form(...),
     name: str = Form(...),
@@ -99,7 +112,7 @@ async def add_user(
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    hashed_password = pwd_context.hash(password)
+    hashed_password = password_service.hash(password)
     new_user = User(
         username=username,
         password=hashed_password,
@@ -123,7 +136,7 @@ async def add_user(
     return {"message": f"{role.capitalize()} added successfully", "user_id": new_user.id}
 
 @router.post("/add-drug")
-async def add_single_drug(
+def add_single_drug(
     # Basic info
     name: str = Form(...),
     prod_ai: str = Form(...),  # Matches Drug model's prod_ai column
@@ -167,7 +180,7 @@ async def add_single_drug(
     }
 
     try:
-        prediction = predict_risk_level(features)
+        prediction, model_version = inference_batcher.score(features)
 
         drug_entry = Drug(
             name=name,
@@ -175,6 +188,9 @@ async def add_single_drug(
             pt=pt,
             outc_cod=outc_cod,
             risk_level=prediction,
+            model_version=model_version,
+            feature_hash=feature_key(features).hex(),
+            catalog_seq=next_catalog_seq(db),
             dose_amt=dose_amt,
             nda_num=nda_num,
             route=route,
@@ -188,9 +204,11 @@ async def add_single_drug(
 
         db.add(drug_entry)
         db.commit()
+        drug_catalog.changed()
         return {
             "message": "Drug added successfully",
             "risk_level": prediction,
+            "model_version": model_version,
             "drug_details": {
                 "name": name,
                 "active_ingredient": prod_ai,
@@ -206,89 +224,143 @@ async def add_single_drug(
             detail=f"Drug addition failed: {str(e)}"
         )
 
-@router.post("/bulk-upload")
-async def bulk_upload(file: UploadFile = File(...), role: str = Depends(get_current_user_role), db: Session = Depends(get_db)):
-    if role != "admin":
+@router.post("/bulk-upload", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_upload(file: UploadFile = File(...), current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to upload bulk data")
-    file_path = f"temp_{file.filename}"
-    with open(file_path, "wb") as buffer:
+    ext = os.path.splitext(file.filename or "")[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type '{ext}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+    # The job outlives this request, so the upload is spooled to a private temp file it owns
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as buffer:
         shutil.copyfileobj(file.file, buffer)
+    job = submit_job(db, "bulk_upload", bulk_upload_job, buffer.name, file.filename, created_by_id=current_user.id)
+    return {"job_id": job.id, "status": job.status, "message": "Bulk upload queued"}
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status(job_id: str, role: str = Depends(get_current_user_role), db: Session = Depends(get_db)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view jobs")
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/progress", response_model=JobProgressResponse)
+def get_job_progress(job_id: str, role: str = Depends(get_current_user_role), db: Session = Depends(get_db)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view jobs")
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    percent = None
+    if job.status == "completed":
+        percent = 100.0
+    elif job.total:
+        percent = round(min(job.processed / job.total, 1.0) * 100, 1)
+    return {"job_id": job.id, "status": job.status, "processed": job.processed, "total": job.total, "percent": percent}
 
+@router.post("/rescore", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+def rescore_drugs(resume_job_id: str = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to re-score drugs")
+    running = active_rescore_job(db)
+    if running:
+        raise HTTPException(status_code=409, detail=f"Re-scoring job {running.id} is already {running.status}")
+    start_after = 0
+    if resume_job_id:
+        previous = get_job(db, resume_job_id)
+        if not previous:
+            raise HTTPException(status_code=404, detail="Job not found")
+        try:
+            start_after = resume_point(previous)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     try:
-        df = pd.read_excel(file_path)
-        # Ensure all expected columns are present, fill missing with defaults
-        expected_columns = ["name", "prod_ai", "pt", "outc_cod", "dose_amt", "nda_num", "route", "dose_unit", "dose_form", "dose_freq", "dechal", "rechal", "role_cod"]
-        for col in expected_columns:
-            if col not in df.columns:
-                df[col] = "Unknown" if col not in ["dose_amt", "nda_num"] else 0
-        results = []
-        for _, row in df.iterrows():
-            features = {
-                "drugname": row["name"],
-                "prod_ai": row["prod_ai"],
-                "pt": row.get("pt", "Unknown"),
-                "outc_cod": row.get("outc_cod", "Unknown"),
-                "dose_amt": float(row.get("dose_amt", 0)),
-                "nda_num": int(row.get("nda_num", 0)),
-                "route": row.get("route", "Unknown"),
-                "dose_unit": row.get("dose_unit", "Unknown"),
-                "dose_form": row.get("dose_form", "Unknown"),
-                "dose_freq": row.get("dose_freq", "Unknown"),
-                "dechal": row.get("dechal", "Unknown"),
-                "rechal": row.get("rechal", "Unknown"),
-                "role_cod": row.get("role_cod", "PS")
-            }
-            risk = predict_risk_level(features, df_clean)
-            drug = Drug(
-                name=features["drugname"],
-                prod_ai=features["prod_ai"],
-                pt=features["pt"],
-                outc_cod=features["outc_cod"],
-                risk_level=risk,
-                dose_amt=features["dose_amt"],
-                nda_num=features["nda_num"],
-                route=features["route"],
-                dose_unit=features["dose_unit"],
-                dose_form=features["dose_form"],
-                dose_freq=features["dose_freq"],
-                dechal=features["dechal"],
-                rechal=features["rechal"],
-                role_cod=features["role_cod"]
-            )
-            db.add(drug)
-            results.append({**features, "risk_level": risk})
-        db.commit()
-        return {"message": "Bulk upload successful", "data": results}
-    finally:
-        db.close()
-        os.remove(file_path)
+        job = submit_job(db, RESCORE_JOB_KIND, rescore_job, start_after, created_by_id=current_user.id)
+    except IntegrityError:
+        # Lost the race to another request; uq_jobs_active_rescore let only one job in
+        db.rollback()
+        raise HTTPException(status_code=409, detail="A re-scoring job is already queued or running")
+    return {"job_id": job.id, "status": job.status, "message": f"Re-scoring drugs after id {start_after}"}
 
 @router.get("/download-template")
-async def download_template(role: str = Depends(get_current_user_role), db: Session = Depends(get_db)):
+def download_template(
+    request: Request,
+    format: str = "xlsx",
+    role: str = Depends(get_current_user_role)
+):
     if role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to download template")
-    template_data = {
-        "name": [""],  # Required
-        "prod_ai": [""],  # Required
-        "pt": ["Unknown"],  # Optional, default "Unknown"
-        "outc_cod": ["Unknown"],  # Optional, default "Unknown"
-        "dose_amt": [0],  # Optional, default 0
-        "nda_num": [0],  # Optional, default 0
-        "route": ["Unknown"],  # Optional, default "Unknown"
-        "dose_unit": ["Unknown"],  # Optional, default "Unknown"
-        "dose_form": ["Unknown"],  # Optional, default "Unknown"
-        "dose_freq": ["Unknown"],  # Optional, default "Unknown"
-        "dechal": ["Unknown"],  # Optional, default "Unknown"
-        "rechal": ["Unknown"],  # Optional, default "Unknown"
-        "role_cod": ["PS"]  # Optional, default "PS"
+    try:
+        template = get_upload_template(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"ETag": template.etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(request.headers.get("if-none-match"), template.etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="{template.filename}"'
+    return Response(content=template.content, media_type=template.media_type, headers=headers)
+
+@router.get("/models")
+def list_model_versions(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to manage models")
+    return {
+        "versions": model_registry.available_versions(),
+        "active_version": model_registry.active_version,
+        "loading_version": model_registry.loading_version
     }
-    df = pd.DataFrame(template_data)
-    file_path = "drug_template.xlsx"
-    df.to_excel(file_path, index=False)
-    return FileResponse(file_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=file_path)
+
+@router.post("/models/{version}/activate", response_model=JobSubmittedResponse, status_code=status.HTTP_202_ACCEPTED)
+def activate_model_version(version: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to manage models")
+    if version not in model_registry.available_versions():
+        raise HTTPException(status_code=404, detail=f"Model version '{version}' not found")
+    # Loaded in the background; live traffic keeps using the current version until the swap
+    job = submit_job(db, "model_load", model_load_job, version, created_by_id=current_user.id)
+    return {"job_id": job.id, "status": job.status, "message": f"Loading model version {version}"}
+
+@router.get("/prediction-cache")
+def get_prediction_cache_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view cache statistics")
+    return prediction_cache.stats()
+
+@router.get("/principal-cache")
+def get_principal_cache_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view cache statistics")
+    return principal_cache.stats()
+
+@router.get("/inference-batcher")
+def get_inference_batcher_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view inference statistics")
+    return inference_batcher.stats()
+
+@router.get("/inference-pool")
+def get_inference_pool_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view inference statistics")
+    return inference_pool.stats()
+
+@router.get("/catalog")
+def get_catalog_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view catalog statistics")
+    return drug_catalog.stats()
+
+@router.get("/password-service")
+def get_password_service_stats(role: str = Depends(get_current_user_role)):
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view password service statistics")
+    return password_service.stats()
 
 @router.delete("/delete-doctor")
-async def delete_doctor(
+def delete_doctor(
     request: DeleteDoctorRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -300,4 +372,5 @@ async def delete_doctor(
         raise HTTPException(status_code=404, detail="Doctor not found")
     db.delete(doctor)
     db.commit()
+    principal_cache.invalidate(request.username)
     return {"message": f"Doctor {request.username} deleted successfully"}
\ No newline at end of file
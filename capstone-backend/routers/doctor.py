@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
-from schemas.request_schemas import DrugInput, DrugRequest, DrugSearchRequest
-from services.prediction_service import predict_risk_level, recommend_alternatives, df_clean
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from schemas.request_schemas import DrugInput, DrugRequest, DrugSearchRequest, ScoreDrugRequest
+from schemas.response_schemas import ScoreDrugResponse
+from services.prediction_service import recommend_alternatives, get_search_index
+from services.inference_batcher import inference_batcher
+from services.metrics import stage
+from services.bulk_upload import normalize_row
 from auth.auth import get_current_user, get_current_user_role
 from database.db import get_db
 from sqlalchemy.orm import Session
 from database.models import User, Patient
-from datetime import datetime, timedelta
-import pytz
+from datetime import date
+from services.appointments import appointment_window, list_appointments, APPOINTMENT_TZ
+from services.pagination import NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, page_size
 from pydantic import BaseModel  # Import Pydantic BaseModel
 
 router = APIRouter(prefix="/doctor", tags=["Doctor"])
@@ -21,7 +26,7 @@ def get_alternatives(request: DrugRequest, current_user: dict = Depends(get_curr
     if role != "doctor":
         raise HTTPException(status_code=403, detail="Only doctors can access this endpoint")
 
-    result = recommend_alternatives(request.drugname, df_clean)
+    result = recommend_alternatives(request.drugname)
     return result
 
 @router.post("/search")
@@ -30,44 +35,56 @@ def search_drugs(request: DrugSearchRequest, current_user: dict = Depends(get_cu
     if role != "doctor":
         raise HTTPException(status_code=403, detail="Only doctors can access this endpoint")
 
-    query = request.query.lower()
-    if not query:
-        return []
+    with stage("drug_search"):
+        return get_search_index().search(request.query)
 
-    matched = df_clean[df_clean['drugname'].str.lower().str.contains(query)]
-
-    results = (
-        matched[['drugname', 'risk_level']]
-        .drop_duplicates('drugname')
-        .head(15)
-        .to_dict(orient='records')
-    )
-
-    return results
+@router.post("/score", response_model=ScoreDrugResponse)
+def score_drug(request: ScoreDrugRequest, current_user: User = Depends(get_current_user)):
+    role = get_current_user_role(current_user)
+    if role != "doctor":
+        raise HTTPException(status_code=403, detail="Only doctors can access this endpoint")
+    raw = request.dict()
+    raw["name"] = raw.pop("drugname")
+    raw["prod_ai"] = raw["prod_ai"] or raw["name"]
+    try:
+        features = normalize_row(raw)
+        # Concurrent requests are coalesced into one model call by the batcher
+        risk_level, model_version = inference_batcher.score(features)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"drugname": features["drugname"], "risk_level": risk_level, "model_version": model_version}
 
 @router.get("/appointments")
-async def get_doctor_appointments(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_doctor_appointments(
+    response: Response,
+    start: date = None,
+    end: date = None,
+    cursor: str = None,
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     role = get_current_user_role(current_user)
     if role != "doctor":
         raise HTTPException(status_code=403, detail="Only doctors can access this endpoint")
-    ist = pytz.timezone('Asia/Kolkata')
-    today = datetime.now(ist).date()
-    current_doctor_id = current_user.id
-    appointments = db.query(Patient).join(User, Patient.doctor_id == User.id, isouter=True).filter(
-        Patient.doctor_id == current_doctor_id,
-        Patient.appointment_date >= today,
-        Patient.appointment_date < today + timedelta(days=7)  # Extended to 7 days for future appointments
-    ).all()
+    # Defaults to the next 7 days, unpaginated; with a limit, further pages come from the X-Next-Cursor header
+    try:
+        start, end = appointment_window(start, end)
+        rows, next_cursor = list_appointments(db, start, end, page_size(limit, cursor), cursor, doctor_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
-            "username": user.username,
-            "appointment_date": p.appointment_date.astimezone(ist).isoformat(),
-            "is_handled": p.is_handled  # Include is_handled in the response
-        } for p, user in [(p, p.user) for p in appointments]
+            "username": row.username,
+            "appointment_date": row.appointment_date.astimezone(APPOINTMENT_TZ).isoformat(),
+            "is_handled": row.is_handled  # Include is_handled in the response
+        } for row in rows
     ]
 
 @router.post("/mark-handled")
-async def mark_appointment_handled(request: MarkHandledRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def mark_appointment_handled(request: MarkHandledRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     role = get_current_user_role(current_user)
     if role != "doctor":
         raise HTTPException(status_code=403, detail="Only doctors can access this endpoint")
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from sqlalchemy.orm import Session
 from database.db import get_db
 from database.models import Nurse, User, Patient
 from auth.auth import get_current_user
-from datetime import datetime, timedelta
-import pytz
+from datetime import date
+from services.appointments import appointment_window, list_appointments, APPOINTMENT_TZ
+from services.pagination import NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, page_size
 
 router = APIRouter(prefix="/nurse", tags=["Nurse"])
 
 @router.get("/profile")
-async def get_nurse_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_nurse_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "nurse":
         raise HTTPException(status_code=403, detail="Not authorized")
     nurse = db.query(Nurse).filter(Nurse.user_id == current_user.id).first()
@@ -24,27 +25,35 @@ async def get_nurse_profile(current_user: User = Depends(get_current_user), db:
     }
 
 @router.get("/appointments")
-async def get_nurse_appointments(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_nurse_appointments(
+    response: Response,
+    start: date = None,
+    end: date = None,
+    cursor: str = None,
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     if current_user.role != "nurse":
         raise HTTPException(status_code=403, detail="Not authorized")
-    ist = pytz.timezone('Asia/Kolkata')
-    today = datetime.now(ist).date()
-    # Fetch appointments for the next 7 days to include upcoming appointments
-    next_week = today + timedelta(days=7)
-    appointments = db.query(Patient).join(User, Patient.user_id == User.id, isouter=True).filter(
-        Patient.appointment_date >= today,
-        Patient.appointment_date < next_week
-    ).all()
+    # Defaults to the next 7 days, unpaginated; with a limit, further pages come from the X-Next-Cursor header
+    try:
+        start, end = appointment_window(start, end)
+        rows, next_cursor = list_appointments(db, start, end, page_size(limit, cursor), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
-            "username": user.username,
-            "appointment_date": p.appointment_date.astimezone(ist).isoformat(),
-            "doctor_id": p.doctor_id  # Include doctor_id to track forwarded status
-        } for p, user in [(p, p.user) for p in appointments]
+            "username": row.username,
+            "appointment_date": row.appointment_date.astimezone(APPOINTMENT_TZ).isoformat(),
+            "doctor_id": row.doctor_id  # Include doctor_id to track forwarded status
+        } for row in rows
     ]
 
 @router.post("/forward-to-doctor/{patient_username}")
-async def forward_to_doctor(patient_username: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def forward_to_doctor(patient_username: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "nurse":
         raise HTTPException(status_code=403, detail="Not authorized")
     patient = db.query(Patient).join(User, Patient.user_id == User.id, isouter=True).filter(User.username == patient_username, User.role == "patient").first()
@@ -1,14 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database.db import get_db
 from database.models import Patient, User
 from auth.auth import create_access_token, get_current_user
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.password_service import password_service
 
 router = APIRouter(prefix="/patient", tags=["Patient"])
 
@@ -19,12 +18,7 @@ class PatientSignupRequest(BaseModel):
     email: str
     phone: str
 
-@router.post("/signup")
-async def patient_signup(request: PatientSignupRequest, db: Session = Depends(get_db)):
-    existing_user = db.query(User).filter((User.username == request.username) | (User.email == request.email)).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Username or email already exists")
-    hashed_password = pwd_context.hash(request.password)
+def _create_patient(db: Session, request: PatientSignupRequest, hashed_password: str):
     new_user = User(username=request.username, password=hashed_password, role="patient", name=request.name, email=request.email, phone=request.phone)
     db.add(new_user)
     db.commit()
@@ -32,19 +26,32 @@ async def patient_signup(request: PatientSignupRequest, db: Session = Depends(ge
     new_patient = Patient(user_id=new_user.id, age=None, address=None, is_profile_complete=False)
     db.add(new_patient)
     db.commit()
+
+# Signup and login are async so that while bcrypt runs they hold no request thread; only the queries take one
+@router.post("/signup")
+async def patient_signup(request: PatientSignupRequest, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter((User.username == request.username) | (User.email == request.email)).first()
+    )
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+    hashed_password = await password_service.hash_async(request.password)
+    await run_in_threadpool(_create_patient, db, request, hashed_password)
     return {"message": "Patient signed up successfully. Please complete your profile."}
 
 @router.post("/token")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username, User.role == "patient").first()
-    if not user or not user.verify_password(form_data.password):
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.username == form_data.username, User.role == "patient").first()
+    )
+    if not user or not await password_service.verify_user_async(db, user, form_data.password):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(data={"sub": user.username, "role": user.role}, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/profile")
-async def get_patient_profile(username: str = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_patient_profile(username: str = None, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role not in ["patient", "doctor"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     if username and current_user.role == "doctor":
@@ -71,7 +78,7 @@ class PatientProfileUpdateRequest(BaseModel):
     address: str
 
 @router.put("/profile")
-async def update_patient_profile(request: PatientProfileUpdateRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def update_patient_profile(request: PatientProfileUpdateRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "patient":
         raise HTTPException(status_code=403, detail="Not authorized")
     patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
@@ -87,7 +94,7 @@ class AppointmentRequest(BaseModel):
     appointment_date: datetime
 
 @router.post("/book-appointment")
-async def book_appointment(request: AppointmentRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def book_appointment(request: AppointmentRequest, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "patient":
         raise HTTPException(status_code=403, detail="Not authorized")
     patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
@@ -98,7 +105,7 @@ async def book_appointment(request: AppointmentRequest, current_user: User = Dep
     return {"message": "Appointment booked successfully"}
 
 @router.get("/appointments")
-async def get_patient_appointments(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_patient_appointments(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "patient":
         raise HTTPException(status_code=403, detail="Not authorized")
     patient = db.query(Patient).filter(Patient.user_id == current_user.id).first()
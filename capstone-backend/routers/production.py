@@ -1,22 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from fastapi.params import Form
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from database.db import get_db
-from database.models import FlaggedDrug, User, df_clean
-import json
-import pandas as pd
+from database.models import FlaggedDrug, User
 from sqlalchemy.orm import Session
 from auth.auth import get_current_user, get_current_user_role
-from passlib.context import CryptContext
+from auth.principal_cache import principal_cache
+from services.flagged_drugs import (
+    list_flagged_drugs, flag_drugs, moderate_flagged_drugs, alternatives_for, FLAGGED_DRUGS_TABLE, MAX_BATCH_ITEMS
+)
+from services.pagination import NEXT_CURSOR_HEADER, MAX_PAGE_SIZE, page_size
+from services.table_versions import get_table_version, etag_for, etag_matches
+from services.prediction_service import get_search_index, get_drug_lookup
+from services.password_service import password_service
+from services.metrics import stage
 
 from schemas.request_schemas import DeleteOperatorRequest
 
 router = APIRouter(prefix="/production", tags=["Production"])
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 class FlagDrugRequest(BaseModel):
     drugname: str
@@ -30,6 +33,21 @@ class UpdateAlternativesRequest(BaseModel):
     alternatives: List[str]
 
 
+class BatchFlagRequest(BaseModel):
+    drugnames: List[str]
+
+
+class ModerationItem(BaseModel):
+    drugname: str
+    suppressed: Optional[bool] = None  # None leaves the field unchanged
+    hidden_by_manager: Optional[bool] = None
+    alternatives: Optional[List[str]] = None
+
+
+class BatchModerationRequest(BaseModel):
+    items: List[ModerationItem]
+
+
 class UserRequest(BaseModel):
     username: str
     password: str
@@ -39,7 +57,7 @@ class UserRequest(BaseModel):
 
 
 @router.post("/add-manager")
-async def add_manager(
+def add_manager(
     username: str,
     password: str,
     name: str,
@@ -53,7 +71,7 @@ async def add_manager(
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
-    hashed_password = pwd_context.hash(password)
+    hashed_password = password_service.hash(password)
     new_user = User(
         username=username,
         password=hashed_password,
@@ -68,7 +86,7 @@ async def add_manager(
     return {"message": f"Manager {name} created successfully. Use /admin/token to log in."}
 
 @router.post("/production/add_user")
-async def add_production_operator(
+def add_production_operator(
     user: UserRequest,
     manager_role: str = Depends(get_current_user_role),
     db: Session = Depends(get_db),
@@ -80,7 +98,7 @@ async def add_production_operator(
     if existing_user:
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = password_service.hash(user.password)
     new_user = User(
         username=user.username,
         password=hashed_password,
@@ -96,30 +114,23 @@ async def add_production_operator(
 
 # Operator Endpoints
 @router.post("/production/search")
-async def search_drugs(request: SearchRequest, db: Session = Depends(get_db),
+def search_drugs(request: SearchRequest, db: Session = Depends(get_db),
                        current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role not in ["production", "manager"]:
         raise HTTPException(status_code=403, detail="Not authorized to search drugs")
-    query = request.query.lower()
-    if not query:
+    if not request.query:
         return []
 
-    if df_clean is None or df_clean.empty:
-        raise HTTPException(status_code=500, detail="Drug data not loaded")
-
-    matched = df_clean[df_clean['drugname'].str.lower().str.contains(query)]
-    results = (
-        matched[['drugname', 'risk_level']]
-        .drop_duplicates('drugname')
-        .head(15)
-        .to_dict(orient='records')
-    )
-    return results
+    with stage("drug_search"):
+        search_index = get_search_index()
+        if len(search_index) == 0:
+            raise HTTPException(status_code=500, detail="Drug data not loaded")
+        return search_index.search(request.query)
 
 
 @router.post("/production/flag")
-async def flag_drug(data: FlagDrugRequest, db: Session = Depends(get_db),
+def flag_drug(data: FlagDrugRequest, db: Session = Depends(get_db),
                     current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "production":
@@ -128,24 +139,16 @@ async def flag_drug(data: FlagDrugRequest, db: Session = Depends(get_db),
     if existing:
         raise HTTPException(status_code=400, detail="Drug already flagged")
 
-    matching_row = df_clean[df_clean['drugname'].str.lower() == data.drugname.lower()]
-    if matching_row.empty:
+    drug = get_drug_lookup().get(data.drugname)
+    if drug is None:
         raise HTTPException(status_code=404, detail="Drug not found in dataset")
 
-    risk_level = matching_row.iloc[0]['risk_level']
-    alternatives = []
-    if risk_level == 'high':
-        high_risk_route = matching_row.iloc[0]['route']
-        low_risk_options = df_clean[df_clean['risk_level'] == 'low']
-        alternatives = low_risk_options[low_risk_options['route'] == high_risk_route]['drugname'].head(5).tolist()
-        if not alternatives:
-            alternatives = ["No suitable alternatives found"]
-
+    risk_level = drug.risk_level
     flagged = FlaggedDrug(
         drugname=data.drugname,
         risk_level=risk_level,
         suppressed=False,
-        alternatives=json.dumps(alternatives),
+        alternatives=alternatives_for(drug, get_drug_lookup()),
         hidden_by_manager=False
     )
     db.add(flagged)
@@ -153,24 +156,63 @@ async def flag_drug(data: FlagDrugRequest, db: Session = Depends(get_db),
     return {"message": "Drug flagged successfully", "drugname": data.drugname, "risk_level": risk_level}
 
 
-@router.get("/production/flagged")
-async def get_flagged_drugs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/production/flag/batch")
+def flag_drugs_batch(data: BatchFlagRequest, db: Session = Depends(get_db),
+                     current_user: User = Depends(get_current_user)):
+    role = get_current_user_role(current_user)
+    if role != "production":
+        raise HTTPException(status_code=403, detail="Only production operators can flag drugs")
+    if len(data.drugnames) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} drugs per batch")
+    results = flag_drugs(db, data.drugnames, get_drug_lookup())
+    return {
+        "flagged": sum(result["status"] == "flagged" for result in results),
+        "results": results
+    }
 
-    flagged = db.query(FlaggedDrug).all()
+
+@router.get("/production/flagged")
+def get_flagged_drugs(
+    request: Request,
+    response: Response,
+    risk_level: str = None,
+    suppressed: bool = None,
+    hidden_by_manager: bool = None,
+    cursor: str = None,
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Unpaginated unless a limit or cursor is sent, which is what the production and manager pages expect
+    limit = page_size(limit, cursor)
+    # The version is read before the rows, so a tag never claims fresher data than it describes
+    version = get_table_version(db, FLAGGED_DRUGS_TABLE)
+    etag = etag_for(FLAGGED_DRUGS_TABLE, version, risk_level, suppressed, hidden_by_manager, cursor, limit)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    try:
+        rows, next_cursor = list_flagged_drugs(db, limit, cursor, risk_level, suppressed, hidden_by_manager)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers.update(cache_headers)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
             "drugname": f.drugname,
             "risk_level": f.risk_level,
             "suppressed": f.suppressed,
-            "alternatives": json.loads(f.alternatives),
+            "alternatives": f.alternatives,
             "hidden_by_manager": f.hidden_by_manager
         }
-        for f in flagged
+        for f in rows
     ]
 
 
 @router.delete("/production/delete/{drugname}")
-async def delete_flagged_drug(drugname: str, db: Session = Depends(get_db),
+def delete_flagged_drug(drugname: str, db: Session = Depends(get_db),
                               current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "production":
@@ -185,7 +227,7 @@ async def delete_flagged_drug(drugname: str, db: Session = Depends(get_db),
 
 # Manager Endpoints
 @router.post("/production/suppress/{drugname}")
-async def suppress_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def suppress_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can suppress drugs")
@@ -198,7 +240,7 @@ async def suppress_drug(drugname: str, db: Session = Depends(get_db), current_us
 
 
 @router.post("/production/unsuppress/{drugname}")
-async def unsuppress_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def unsuppress_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can unsuppress drugs")
@@ -211,7 +253,7 @@ async def unsuppress_drug(drugname: str, db: Session = Depends(get_db), current_
 
 
 @router.post("/production/update_alternatives/{drugname}")
-async def update_alternatives(drugname: str, data: UpdateAlternativesRequest, db: Session = Depends(get_db),
+def update_alternatives(drugname: str, data: UpdateAlternativesRequest, db: Session = Depends(get_db),
                               current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "manager":
@@ -219,13 +261,28 @@ async def update_alternatives(drugname: str, data: UpdateAlternativesRequest, db
     drug = db.query(FlaggedDrug).filter_by(drugname=drugname).first()
     if not drug:
         raise HTTPException(status_code=404, detail="Drug not found")
-    drug.alternatives = json.dumps(data.alternatives)
+    drug.alternatives = data.alternatives
     db.commit()
     return {"message": f"Alternatives updated for {drugname}", "alternatives": data.alternatives}
 
 
+@router.post("/production/moderate/batch")
+def moderate_drugs_batch(data: BatchModerationRequest, db: Session = Depends(get_db),
+                         current_user: User = Depends(get_current_user)):
+    role = get_current_user_role(current_user)
+    if role != "manager":
+        raise HTTPException(status_code=403, detail="Only managers can moderate flagged drugs")
+    if len(data.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ITEMS} drugs per batch")
+    results = moderate_flagged_drugs(db, [item.dict() for item in data.items])
+    return {
+        "updated": sum(result["status"] == "updated" for result in results),
+        "results": results
+    }
+
+
 @router.post("/production/hide/{drugname}")
-async def hide_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def hide_drug(drugname: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     role = get_current_user_role(current_user)
     if role != "manager":
         raise HTTPException(status_code=403, detail="Only managers can hide drugs")
@@ -238,7 +295,7 @@ async def hide_drug(drugname: str, db: Session = Depends(get_db), current_user:
 
 
 @router.get("/production/profile")
-async def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     profile_data = {
         "username": current_user.username,
         "name": current_user.name,
@@ -265,7 +322,7 @@ async def get_profile(current_user: User = Depends(get_current_user), db: Sessio
 
 
 @router.delete("/delete-operator")
-async def delete_operator(
+def delete_operator(
     request:    DeleteOperatorRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -277,4 +334,5 @@ async def delete_operator(
         raise HTTPException(status_code=404, detail="Production operator not found")
     db.delete(operator)
     db.commit()
+    principal_cache.invalidate(request.username)
     return {"message": f"Production operator {request.username} deleted successfully"}
\ No newline at end of file
@@ -40,4 +40,19 @@ class DeleteOperatorRequest(BaseModel):
     username: str
 
 class DeleteDoctorRequest(BaseModel):
-    username: str
\ No newline at end of file
+    username: str
+
+# For doctor on-demand scoring; omitted fields take the bulk-upload defaults
+class ScoreDrugRequest(BaseModel):
+    drugname: str
+    prod_ai: Optional[str] = None  # Defaults to drugname
+    pt: Optional[str] = None
+    route: Optional[str] = None
+    dose_amt: Optional[float] = None
+    nda_num: Optional[float] = None
+    dose_unit: Optional[str] = None
+    dose_form: Optional[str] = None
+    dose_freq: Optional[str] = None
+    dechal: Optional[str] = None
+    rechal: Optional[str] = None
+    role_cod: Optional[str] = None
@@ -1,11 +1,18 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from datetime import datetime
 
 # For doctor view
 class RiskPredictionResponse(BaseModel):
     risk_level: str
     alternatives: List[str]
 
+# For doctor on-demand scoring
+class ScoreDrugResponse(BaseModel):
+    drugname: str
+    risk_level: str
+    model_version: Optional[str] = None
+
 # For admin single prediction response
 class AdminSinglePredictionResponse(BaseModel):
     drugname: str
@@ -13,15 +20,49 @@ class AdminSinglePredictionResponse(BaseModel):
     message: str = "Drug added successfully"
 
 # For bulk upload response
+class BulkUploadError(BaseModel):
+    row: int
+    error: str
+
 class BulkUploadResponse(BaseModel):
+    job_id: str
+    message: str
+    total_rows: int
     added: int
     skipped: int
+    errors: List[BulkUploadError]
+    errors_truncated: bool
+
+# For background jobs (bulk upload, re-scoring)
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: str
     message: str
 
+class JobProgressResponse(BaseModel):
+    job_id: str
+    status: str
+    processed: int
+    total: Optional[int] = None
+    percent: Optional[float] = None
+
+class JobStatusResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    processed: int
+    total: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 class FlaggedDrugResponse(BaseModel):
     drugname: str
     risk_level: str
     suppressed: bool
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,79 @@
+from collections import Counter
+
+import pandas as pd
+
+
+def split_symptoms(pt: str) -> list:
+    return [s.strip() for s in pt.split(',')]
+
+
+class AlternativesIndex:
+    """
+    Low-risk drugs grouped by route, with an inverted index from symptom term to entries.
+
+    An entry is one distinct (drugname, route, symptom set) combination among the
+    low-risk rows, numbered in dataset order, so repeated FAERS reports of the same
+    drug collapse into a single posting. Entries are reference counted so rows
+    can be removed again (a drug re-scored as high risk); a removed entry keeps
+    its postings and is skipped by ``find``.
+    """
+
+    def __init__(self):
+        self.entry_names = []  # entry id -> drugname
+        self.postings = {}  # route -> {symptom term -> [entry ids]}
+        self._entry_ids = {}
+        self._refs = []  # entry id -> number of rows behind it
+        self._removed = set()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AlternativesIndex":
+        index = cls()
+        low_risk = df[(df['risk_level'] == 'low') & df['pt'].notna() & df['route'].notna()]
+        for drugname, route, pt in zip(low_risk['drugname'], low_risk['route'], low_risk['pt']):
+            index.add(drugname, route, pt)
+        return index
+
+    def add(self, drugname: str, route: str, pt: str):
+        terms = frozenset(split_symptoms(pt))
+        key = (drugname, route, terms)
+        if key in self._entry_ids:
+            self._refs[self._entry_ids[key]] += 1
+            return
+        entry_id = len(self.entry_names)
+        self.entry_names.append(drugname)
+        self._refs.append(1)
+        self._entry_ids[key] = entry_id
+        route_postings = self.postings.setdefault(route, {})
+        for term in terms:
+            route_postings.setdefault(term, []).append(entry_id)
+
+    def remove(self, drugname: str, route: str, pt: str):
+        """Undo one ``add`` of the same row; the entry disappears once no row is left behind it."""
+        key = (drugname, route, frozenset(split_symptoms(pt)))
+        entry_id = self._entry_ids.get(key)
+        if entry_id is None:
+            return
+        self._refs[entry_id] -= 1
+        if self._refs[entry_id] == 0:
+            self._removed.add(entry_id)
+            del self._entry_ids[key]  # A later add starts a fresh entry
+
+    def find(self, route: str, symptoms: list) -> set:
+        """
+        Low-risk drugs on ``route`` sharing at least half of ``symptoms``.
+
+        Overlap is counted against the distinct symptom terms while the ratio uses
+        ``len(symptoms)``, exactly like the original row-by-row scan. Names are
+        added in dataset order, so the returned set iterates the same way the scan's did.
+        """
+        route_postings = self.postings.get(route)
+        if not route_postings or not symptoms:
+            return set()
+        overlap = Counter()
+        for term in set(symptoms):
+            overlap.update(route_postings.get(term, ()))
+        required = len(symptoms)
+        return {
+            self.entry_names[entry_id] for entry_id in sorted(overlap)
+            if 2 * overlap[entry_id] >= required and entry_id not in self._removed
+        }
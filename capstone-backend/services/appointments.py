@@ -0,0 +1,74 @@
+from datetime import date, datetime, time, timedelta
+
+import pytz
+from sqlalchemy.orm import Session
+
+from database.models import Patient, User
+from services.pagination import after_keyset, decode_cursor, encode_cursor
+
+APPOINTMENT_TZ = pytz.timezone('Asia/Kolkata')
+# Window used when the caller gives no end date
+DEFAULT_WINDOW_DAYS = 7
+
+
+def appointment_window(start: date = None, end: date = None) -> tuple:
+    """[start, end) dates, defaulting to today (IST) and the following DEFAULT_WINDOW_DAYS days."""
+    start = start or datetime.now(APPOINTMENT_TZ).date()
+    end = end or start + timedelta(days=DEFAULT_WINDOW_DAYS)
+    if end <= start:
+        raise ValueError("end must be after start")
+    return start, end
+
+
+APPOINTMENT_SORT_KEY = [Patient.appointment_date, Patient.id]
+
+
+def appointments_query(db: Session, start: date, end: date, cursor: str = None, doctor_id: int = None):
+    """
+    Ordered query for appointments in [start, end), optionally for one doctor and after ``cursor``.
+
+    Served by ix_patients_appointment_date_id, or ix_patients_doctor_id_appointment_date
+    when ``doctor_id`` is given (see check_query_plans.py).
+    """
+    query = db.query(
+        Patient.id, User.username, Patient.appointment_date, Patient.doctor_id, Patient.is_handled
+    ).join(User, Patient.user_id == User.id).filter(
+        Patient.appointment_date >= datetime.combine(start, time.min),
+        Patient.appointment_date < datetime.combine(end, time.min)
+    )
+    if doctor_id is not None:
+        query = query.filter(Patient.doctor_id == doctor_id)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        query = query.filter(after_keyset(APPOINTMENT_SORT_KEY, [last_date, last_id]))
+    return query.order_by(*APPOINTMENT_SORT_KEY)
+
+
+def list_appointments(db: Session, start: date, end: date, limit: int, cursor: str = None,
+                      doctor_id: int = None) -> tuple:
+    """
+    One page of appointments in [start, end), ordered by (appointment_date, patient id).
+
+    ``limit`` None returns every appointment in the window as a single page.
+
+    Patient and user columns are read in a single joined query; no ORM
+    objects or lazy relationships are involved.
+
+    Returns:
+        tuple: (rows, next_cursor) where rows have username, appointment_date,
+        doctor_id and is_handled, and next_cursor is None on the last page.
+    """
+    query = appointments_query(db, start, end, cursor, doctor_id)
+    if limit is None:
+        return query.all(), None
+    # One extra row tells us whether another page exists without a COUNT
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].appointment_date.isoformat(), rows[-1].id])
+    return rows, next_cursor
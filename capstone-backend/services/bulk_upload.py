@@ -0,0 +1,280 @@
+import os
+import uuid
+
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database.models import Drug
+from services.catalog import drug_catalog, next_catalog_seq
+from services.prediction_cache import feature_key
+from services.prediction_service import score_records
+
+# Rows read, scored and inserted per transaction
+CHUNK_SIZE = 2000
+# Cap on per-row errors echoed back, so a malformed sheet can't blow up the response
+MAX_REPORTED_ERRORS = 1000
+# Keeps "WHERE name IN (...)" under SQLite's bound-parameter limit
+NAME_LOOKUP_BATCH = 500
+
+SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm", ".csv", ".parquet")
+
+REQUIRED_COLUMNS = ["name", "prod_ai"]
+TEXT_DEFAULTS = {
+    "pt": "Unknown",
+    "outc_cod": "Unknown",
+    "route": "Unknown",
+    "dose_unit": "Unknown",
+    "dose_form": "Unknown",
+    "dose_freq": "Unknown",
+    "dechal": "Unknown",
+    "rechal": "Unknown",
+    "role_cod": "PS",
+}
+NUMERIC_DEFAULTS = {"dose_amt": 0.0, "nda_num": 0}
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and pd.isna(value)) or (isinstance(value, str) and not value.strip())
+
+
+def _iter_excel_rows(fileobj, chunk_size: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col).strip() if col is not None else "" for col in header]
+        chunk = []
+        for values in rows:
+            chunk.append(dict(zip(columns, values)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+
+def _iter_csv_rows(fileobj, chunk_size: int):
+    # Blank lines are kept (as all-NaN rows process_chunk skips) so row numbers match the file's lines
+    for frame in pd.read_csv(fileobj, chunksize=chunk_size, skip_blank_lines=False):
+        yield frame.to_dict(orient="records")
+
+
+def _iter_parquet_rows(fileobj, chunk_size: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet uploads require the 'pyarrow' package")
+
+    for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+def iter_upload_chunks(fileobj, filename: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Stream an uploaded sheet as lists of row dicts, ``chunk_size`` rows at a time.
+
+    Args:
+        fileobj: Binary file-like object holding the upload.
+        filename (str): Original file name, used to pick the reader.
+        chunk_size (int): Maximum number of rows per chunk.
+
+    Returns:
+        Iterator[list[dict]]: Row chunks keyed by the sheet's header names.
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return _iter_excel_rows(fileobj, chunk_size)
+    if ext == ".csv":
+        return _iter_csv_rows(fileobj, chunk_size)
+    if ext == ".parquet":
+        return _iter_parquet_rows(fileobj, chunk_size)
+    raise ValueError(f"Unsupported file type '{ext}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}")
+
+
+def count_upload_rows(path: str, filename: str):
+    """
+    Cheap row count from file metadata where the format has one (xlsx, Parquet); None otherwise.
+
+    The count includes blank rows (xlsx ``max_row`` covers every formatted
+    row), so progress is measured against rows read rather than rows imported.
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    if ext == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def normalize_row(raw: dict) -> dict:
+    """Turn a raw sheet row into the feature dict expected by the predictor."""
+    for col in REQUIRED_COLUMNS:
+        if _is_blank(raw.get(col)):
+            raise ValueError(f"Missing required field '{col}'")
+
+    features = {
+        "drugname": str(raw["name"]).strip(),
+        "prod_ai": str(raw["prod_ai"]).strip(),
+    }
+    for col, default in TEXT_DEFAULTS.items():
+        value = raw.get(col)
+        features[col] = default if _is_blank(value) else str(value).strip()
+    for col, default in NUMERIC_DEFAULTS.items():
+        value = raw.get(col)
+        try:
+            features[col] = default if _is_blank(value) else type(default)(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid numeric value for '{col}': {value!r}")
+    return features
+
+
+def _existing_names(db: Session, names: list) -> set:
+    existing = set()
+    for start in range(0, len(names), NAME_LOOKUP_BATCH):
+        batch = names[start:start + NAME_LOOKUP_BATCH]
+        existing.update(db.execute(select(Drug.name).where(Drug.name.in_(batch))).scalars())
+    return existing
+
+
+def _to_drug_row(features: dict, risk_level: str, model_version: str, catalog_seq: int = None) -> dict:
+    row = {col: features[col] for col in list(TEXT_DEFAULTS) + list(NUMERIC_DEFAULTS) + ["prod_ai"]}
+    row["name"] = features["drugname"]
+    row["risk_level"] = risk_level
+    row["model_version"] = model_version
+    row["feature_hash"] = feature_key(features).hex()
+    row["catalog_seq"] = catalog_seq
+    return row
+
+
+class BulkUploadSummary:
+    """Running counters for one upload; only the first MAX_REPORTED_ERRORS errors are kept."""
+
+    def __init__(self, job_id: str = None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.rows_read = 0  # Including blank rows, which total_rows leaves out
+        self.total_rows = 0
+        self.added = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, row: int, error: str):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "message": "Bulk upload completed",
+            "total_rows": self.total_rows,
+            "added": self.added,
+            "skipped": self.skipped,
+            # Checks run in passes over each chunk, so errors are found out of row order
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": len(self.errors) < self.skipped,
+        }
+
+
+def process_chunk(db: Session, rows: list, first_row: int, seen_names: set, summary: BulkUploadSummary):
+    """Validate, score and insert one chunk of rows in a single transaction."""
+    candidates = []
+    for offset, raw in enumerate(rows):
+        if all(_is_blank(value) for value in raw.values()):
+            continue  # Trailing/empty spreadsheet rows
+        row_number = first_row + offset
+        summary.total_rows += 1
+        try:
+            candidates.append((row_number, normalize_row(raw)))
+        except ValueError as e:
+            summary.add_error(row_number, str(e))
+
+    existing = _existing_names(db, list({features["drugname"] for _, features in candidates}))
+    valid = []
+    for row_number, features in candidates:
+        name = features["drugname"]
+        if name in existing:
+            summary.add_error(row_number, f"Drug '{name}' already exists")
+        elif name in seen_names:
+            summary.add_error(row_number, f"Duplicate drug '{name}' in upload")
+        else:
+            seen_names.add(name)
+            valid.append((row_number, features))
+    if not valid:
+        return
+
+    try:
+        risks, model_version = score_records([features for _, features in valid])
+        seq = next_catalog_seq(db)
+        db.execute(insert(Drug), [
+            _to_drug_row(features, risk, model_version, seq) for (_, features), risk in zip(valid, risks)
+        ])
+        db.commit()
+        drug_catalog.changed()
+        summary.added += len(valid)
+    except Exception as e:
+        db.rollback()
+        for row_number, features in valid:
+            seen_names.discard(features["drugname"])
+            summary.add_error(row_number, f"Chunk failed: {str(e)}")
+
+
+def run_bulk_upload(db: Session, fileobj, filename: str, chunk_size: int = CHUNK_SIZE, job_id: str = None,
+                    on_chunk=None) -> dict:
+    """
+    Stream an upload through validation, batched scoring and per-chunk bulk inserts.
+
+    Rows are numbered as they appear in the sheet, so the header is row 1 and
+    the first data row is row 2.
+
+    Args:
+        on_chunk (callable, optional): Called with the BulkUploadSummary after every chunk.
+
+    Returns:
+        dict: Compact summary with counts and the (possibly truncated) per-row error list.
+    """
+    summary = BulkUploadSummary(job_id)
+    seen_names = set()
+    for rows in iter_upload_chunks(fileobj, filename, chunk_size):
+        process_chunk(db, rows, summary.rows_read + 2, seen_names, summary)
+        summary.rows_read += len(rows)
+        if on_chunk:
+            on_chunk(summary)
+    return summary.to_dict()
+
+
+def bulk_upload_job(db: Session, progress, path: str, filename: str) -> dict:
+    """Job entry point: import a spooled upload from ``path`` and delete it afterwards."""
+    try:
+        progress.update(total=count_upload_rows(path, filename))
+        rows_read = 0
+
+        def on_chunk(summary):
+            nonlocal rows_read
+            rows_read = summary.rows_read
+            progress.update(processed=rows_read)
+
+        with open(path, "rb") as fileobj:
+            result = run_bulk_upload(db, fileobj, filename, job_id=progress.job_id, on_chunk=on_chunk)
+        # The metadata count is only an estimate; finish at exactly what was read
+        progress.update(processed=rows_read, total=rows_read)
+        return result
+    finally:
+        os.remove(path)
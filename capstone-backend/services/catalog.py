@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database.db import SessionLocal
+from database.models import Drug
+from services.alternatives_index import AlternativesIndex
+from services.dataset import get_dataset
+from services.drug_lookup import DrugLookup, DrugRecord
+from services.search_index import DrugSearchIndex
+from services.table_versions import get_table_version, next_table_version
+from services.utils import LazyResource
+
+DRUGS_TABLE = Drug.__tablename__
+# How often a worker checks the drugs change counter for writes made through other workers
+CATALOG_SYNC_SECONDS = float(os.getenv("CATALOG_SYNC_SECONDS", "2"))
+
+_COLUMNS = [Drug.id, Drug.name, Drug.risk_level, Drug.route, Drug.pt, Drug.catalog_seq]
+
+
+def next_catalog_seq(db: Session) -> int:
+    """Stamp for drugs rows inserted, or whose risk level changes, in ``db``'s transaction."""
+    return next_table_version(db, DRUGS_TABLE)
+
+
+def changes_since_query(version: int):
+    """Drugs rows stamped after ``version``, in the order they were written."""
+    return select(*_COLUMNS).where(Drug.catalog_seq > version).order_by(Drug.catalog_seq, Drug.id)
+
+
+def _record(row) -> DrugRecord:
+    return DrugRecord(row.name, row.risk_level, row.route, row.pt if isinstance(row.pt, str) and row.pt else None)
+
+
+def _is_alternative(record: DrugRecord) -> bool:
+    # The same rows AlternativesIndex.from_frame takes from the dataset
+    return record.risk_level == 'low' and isinstance(record.route, str) and record.pt is not None
+
+
+class DrugCatalog:
+    """
+    The FAERS baseline dataset plus the drugs table, behind the search, lookup and alternatives indexes.
+
+    Each worker builds the indexes over the baseline frame once and adds every
+    drugs row on top. Baseline rows come first, so a name in both keeps its
+    baseline entry, the same first-row-wins rule the indexes already use.
+    From then on the catalog follows the "drugs" counter in table_versions.
+    Every insert or risk level change stamps its rows with the bumped counter
+    (``next_catalog_seq``), and ``sync`` applies only the rows stamped after
+    the version this worker has seen. Writes through another worker show up
+    within CATALOG_SYNC_SECONDS; writes through this one call ``changed`` and
+    show up on the next read. Nothing is rebuilt.
+    """
+
+    def __init__(self, session_factory=SessionLocal, sync_seconds: float = CATALOG_SYNC_SECONDS):
+        self._session_factory = session_factory
+        self.sync_seconds = sync_seconds
+        self._indexes = LazyResource(self._load)
+        self._rows = {}  # drugs.id -> DrugRecord as last applied
+        self._search_owners = {}  # name -> drugs.id, for search entries a drugs row introduced
+        self._sync_lock = threading.Lock()
+        self._next_sync = 0.0
+        self.version = 0
+        self.syncs = 0
+        self.rows_applied = 0
+
+    def _load(self) -> tuple:
+        df = get_dataset()
+        indexes = (DrugSearchIndex.from_frame(df), DrugLookup.from_frame(df), AlternativesIndex.from_frame(df))
+        db = self._session_factory()
+        try:
+            version = get_table_version(db, DRUGS_TABLE)
+            rows = db.execute(select(*_COLUMNS).order_by(Drug.id)).all()
+        finally:
+            db.close()
+        self._apply(rows, *indexes)
+        self.version = max([version] + [row.catalog_seq or 0 for row in rows])
+        self._next_sync = time.monotonic() + self.sync_seconds
+        return indexes
+
+    def _apply(self, rows: list, search: DrugSearchIndex, lookup: DrugLookup, alternatives: AlternativesIndex):
+        new_rows = []
+        for row in rows:
+            record = _record(row)
+            previous = self._rows.get(row.id)
+            self._rows[row.id] = record
+            if previous is None:
+                lookup.add(record)
+                new_rows.append((row.id, record))
+            else:
+                lookup.replace(previous, record)
+                if self._search_owners.get(record.drugname) == row.id:
+                    search.set_risk_level(record.drugname, record.risk_level)
+                if _is_alternative(previous):
+                    alternatives.remove(previous.drugname, previous.route, previous.pt)
+            if _is_alternative(record):
+                alternatives.add(record.drugname, record.route, record.pt)
+
+        added = set(search.add_many([(record.drugname, record.risk_level) for _, record in new_rows]))
+        for drug_id, record in new_rows:
+            if record.drugname in added:
+                self._search_owners.setdefault(record.drugname, drug_id)
+        self.rows_applied += len(rows)
+
+    def load(self):
+        self._indexes.get()
+
+    def changed(self):
+        """Make the next read catch up right away; call after committing drugs rows stamped with ``next_catalog_seq``."""
+        self._next_sync = 0.0
+
+    def sync(self):
+        """Apply the drugs rows stamped since this worker last looked, at most once per ``sync_seconds``."""
+        if not self._indexes.loaded or time.monotonic() < self._next_sync:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return  # Another request is already catching up; serve what is there
+        try:
+            self._next_sync = time.monotonic() + self.sync_seconds
+            db = self._session_factory()
+            try:
+                version = get_table_version(db, DRUGS_TABLE)
+                rows = db.execute(changes_since_query(self.version)).all() if version > self.version else []
+            finally:
+                db.close()
+            if rows:
+                self._apply(rows, *self._indexes.get())
+                self.syncs += 1
+            self.version = max([version, self.version] + [row.catalog_seq for row in rows])
+        finally:
+            self._sync_lock.release()
+
+    def _current(self) -> tuple:
+        indexes = self._indexes.get()
+        self.sync()
+        return indexes
+
+    def search_index(self) -> DrugSearchIndex:
+        return self._current()[0]
+
+    def lookup(self) -> DrugLookup:
+        return self._current()[1]
+
+    def alternatives_index(self) -> AlternativesIndex:
+        return self._current()[2]
+
+    def stats(self) -> dict:
+        loaded = self._indexes.loaded
+        return {
+            "loaded": loaded,
+            "version": self.version,
+            "drug_rows": len(self._rows),
+            "search_names": len(self._indexes.get()[0]) if loaded else 0,
+            "syncs": self.syncs,
+            "rows_applied": self.rows_applied,
+            "sync_seconds": self.sync_seconds
+        }
+
+
+drug_catalog = DrugCatalog()
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pandas as pd
+
+from services.utils import LazyResource
+
+# Cleaned dataset; overridable so benchmarks and staging can point at another copy
+DF_CLEAN_PATH = os.getenv("DF_CLEAN_PATH", "models/df_clean.csv")
+# Columnar copy of the CSV, written next to it the first time it is loaded (needs pyarrow)
+PARQUET_CACHE_PATH = os.path.splitext(DF_CLEAN_PATH)[0] + ".parquet"
+
+# Low-cardinality columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['route', 'risk_level', 'dose_unit', 'dose_form', 'dose_freq', 'dechal', 'rechal', 'role_cod', 'outc_cod']
+# Highly repetitive free-text columns whose strings are interned so repeats share one object
+INTERNED_COLUMNS = ['drugname', 'prod_ai', 'pt']
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORICAL_COLUMNS:
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in INTERNED_COLUMNS:
+        if col in df:
+            df[col] = df[col].map(_intern)
+    return df
+
+
+def _parquet_is_fresh(csv_path: str, parquet_path: str) -> bool:
+    return os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+
+def _write_parquet_cache(df: pd.DataFrame, parquet_path: str):
+    # Written under a temporary name and renamed, so concurrent workers never read a partial file
+    tmp_path = f"{parquet_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError, ValueError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_dataset(csv_path: str = DF_CLEAN_PATH, parquet_path: str = PARQUET_CACHE_PATH) -> pd.DataFrame:
+    """
+    Load the cleaned FAERS dataset in its compact in-memory form.
+
+    The Parquet cache is used when it is at least as new as the CSV and pyarrow
+    is installed; otherwise the CSV is parsed and the cache (re)built.
+
+    Returns:
+        pd.DataFrame: The dataset with categorical and interned string columns.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"{csv_path} not found. Please ensure the file exists.")
+
+    df = None
+    if _parquet_is_fresh(csv_path, parquet_path):
+        try:
+            df = pd.read_parquet(parquet_path)
+        except (ImportError, OSError, ValueError):
+            df = None
+    if df is None:
+        df = pd.read_csv(csv_path, dtype={col: 'category' for col in CATEGORICAL_COLUMNS})
+        _write_parquet_cache(df, parquet_path)
+
+    if df.empty:
+        raise ValueError(f"{csv_path} is empty")
+    return _compact(df)
+
+
+# The single copy of the dataset shared by every router and service in this process, loaded on first use
+_dataset = LazyResource(load_dataset)
+
+
+def get_dataset() -> pd.DataFrame:
+    return _dataset.get()
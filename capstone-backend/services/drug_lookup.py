@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+import pandas as pd
+
+DrugRecord = namedtuple("DrugRecord", ["drugname", "risk_level", "route", "pt"])
+
+
+class DrugLookup:
+    """
+    Exact, case-insensitive drug name lookups plus the low-risk drug names on each route.
+
+    A name maps to its first row in the dataset, which is the row the
+    ``str.lower() ==`` filter followed by ``iloc[0]`` used to pick. Low-risk
+    names per route keep dataset order (duplicates included), so taking the
+    first few matches what ``head()`` returned on the filtered frame.
+    """
+
+    def __init__(self, records: dict, low_risk_by_route: dict):
+        self.records = records  # lower-cased name -> DrugRecord
+        self.low_risk_by_route = low_risk_by_route  # route -> [drugname, ...]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DrugLookup":
+        named = df[df['drugname'].notna()]
+        lowered = named['drugname'].astype(str).str.lower()
+        first = named.loc[~lowered.duplicated(), ['drugname', 'risk_level', 'route', 'pt']]
+        # Unscored rows keep a None risk level rather than the string 'nan'
+        risk_levels = first['risk_level'].map(lambda risk_level: None if pd.isna(risk_level) else str(risk_level))
+        records = {
+            drugname.lower(): DrugRecord(drugname, risk_level, route, pt if isinstance(pt, str) else None)
+            for drugname, risk_level, route, pt in zip(
+                first['drugname'].astype(str), risk_levels,
+                first['route'].astype(object), first['pt'].astype(object))
+        }
+
+        low_risk = named[(named['risk_level'] == 'low') & named['route'].notna()]
+        low_risk_by_route = {}
+        for drugname, route in zip(low_risk['drugname'].astype(str), low_risk['route'].astype(str)):
+            low_risk_by_route.setdefault(route, []).append(drugname)
+        return cls(records, low_risk_by_route)
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record: DrugRecord) -> bool:
+        """
+        Add one more row. Like ``from_frame``, an existing name keeps its record.
+
+        Returns:
+            bool: Whether ``record`` became the record for its name.
+        """
+        if record.risk_level == 'low' and isinstance(record.route, str):
+            self.low_risk_by_route.setdefault(record.route, []).append(record.drugname)
+        key = record.drugname.lower()
+        if key in self.records:
+            return False
+        self.records[key] = record
+        return True
+
+    def replace(self, old: DrugRecord, new: DrugRecord):
+        """Swap a row added earlier for its updated version, keeping the name's record if ``old`` was it."""
+        if old.risk_level == 'low' and isinstance(old.route, str):
+            names = self.low_risk_by_route.get(old.route, [])
+            if old.drugname in names:
+                names.remove(old.drugname)
+        if new.risk_level == 'low' and isinstance(new.route, str):
+            self.low_risk_by_route.setdefault(new.route, []).append(new.drugname)
+        if self.records.get(old.drugname.lower()) is old:
+            self.records[old.drugname.lower()] = new
+
+    def get(self, drugname: str):
+        """The DrugRecord for ``drugname`` (any case), or None."""
+        return self.records.get(drugname.lower())
+
+    def get_many(self, drugnames: list) -> dict:
+        """{requested name: DrugRecord or None} for a batch of names."""
+        return {name: self.records.get(name.lower()) for name in drugnames}
+
+    def low_risk_on_route(self, route: str, limit: int = 5) -> list:
+        if not isinstance(route, str):
+            return []
+        return self.low_risk_by_route.get(route, [])[:limit]
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Columns expected in synthetic data input
+categorical_cols = ['route', 'dose_unit', 'dose_form', 'dose_freq', 'dechal', 'rechal']
+numeric_cols = ['dose_amt', 'nda_num', 'num_symptoms', 'primary_dose']
+
+
+class FeaturePipeline:
+    """
+    Vectorised feature builder for batches of input records.
+
+    Everything that does not depend on the input (category code tables, scaler
+    statistics and the position of every entry of ``feature_cols``) is computed
+    once here, so transforming a batch is a handful of numpy operations plus a
+    single sparse TF-IDF transform.
+    """
+
+    def __init__(self, tfidf, scaler, encoders, feature_cols):
+        self.tfidf = tfidf
+
+        # Known classes per categorical column, plus the code unseen values map to
+        self.category_codes = {}
+        for col in categorical_cols:
+            if col in encoders:
+                classes = pd.Index(encoders[col].classes_)
+                unknown_code = classes.get_loc('Unknown') if 'Unknown' in classes else -1
+                self.category_codes[col] = (classes, unknown_code)
+
+        # Scaler statistics in numeric_cols order
+        scaler_cols = list(getattr(scaler, 'feature_names_in_', numeric_cols))
+        order = [scaler_cols.index(col) for col in numeric_cols]
+        self.scale_mean = scaler.mean_[order] if scaler.with_mean else np.zeros(len(numeric_cols))
+        self.scale_std = scaler.scale_[order] if scaler.with_std else np.ones(len(numeric_cols))
+
+        # Dense block layout: scaled numerics first, then the remaining engineered columns
+        self.dense_cols = numeric_cols + ['is_primary'] + categorical_cols
+        tfidf_cols = [f'tfidf_{term}' for term in tfidf.get_feature_names_out()]
+        position = {col: i for i, col in enumerate(self.dense_cols + tfidf_cols)}
+        self.column_index = np.array([position[col] for col in feature_cols])
+
+    def encode_categorical(self, col: str, values: list) -> np.ndarray:
+        if col not in self.category_codes:
+            return np.asarray(values, dtype=np.float64)
+        classes, unknown_code = self.category_codes[col]
+        codes = classes.get_indexer(values)
+        unseen = codes < 0
+        if unseen.any():
+            if unknown_code < 0:
+                raise ValueError(f"Unseen value for '{col}' and no 'Unknown' class to fall back to")
+            codes[unseen] = unknown_code
+        return codes
+
+    def encode(self, records: list) -> tuple:
+        """
+        The compact, picklable part of ``transform``.
+
+        Returns:
+            tuple: (scaled dense block as a float64 array, list of symptom texts), ready for ``assemble``.
+        """
+        n = len(records)
+        pts = [r['pt'] if isinstance(r.get('pt'), str) else '' for r in records]
+
+        dense = np.empty((n, len(self.dense_cols)), dtype=np.float64)
+        dose_amt = np.array([r['dose_amt'] for r in records], dtype=np.float64)
+        is_primary = np.array([r['role_cod'] == 'PS' for r in records], dtype=np.float64)
+        dense[:, 0] = dose_amt
+        dense[:, 1] = np.array([r['nda_num'] for r in records], dtype=np.float64)
+        dense[:, 2] = [len(pt.split(',')) if pt else 0 for pt in pts]
+        dense[:, 3] = is_primary * dose_amt
+        dense[:, :4] = (dense[:, :4] - self.scale_mean) / self.scale_std
+        dense[:, 4] = is_primary
+        for offset, col in enumerate(categorical_cols, start=5):
+            dense[:, offset] = self.encode_categorical(col, [r[col] for r in records])
+        return dense, pts
+
+    def assemble(self, dense: np.ndarray, pts: list) -> sparse.csr_matrix:
+        # TF-IDF stays sparse; columns are reordered to feature_cols by position
+        X = sparse.hstack([sparse.csr_matrix(dense), self.tfidf.transform(pts)], format='csr')
+        return X[:, self.column_index]
+
+    def transform(self, records: list) -> sparse.csr_matrix:
+        return self.assemble(*self.encode(records))
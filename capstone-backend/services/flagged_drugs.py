@@ -0,0 +1,166 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database.models import FlaggedDrug
+from services.drug_lookup import DrugLookup, DrugRecord
+from services.pagination import after_keyset, decode_cursor, encode_cursor
+from services.table_versions import bump_table_version
+
+FLAGGED_DRUGS_TABLE = FlaggedDrug.__tablename__
+# Most names accepted by one batch request
+MAX_BATCH_ITEMS = 1000
+# Keeps "WHERE drugname IN (...)" under SQLite's bound-parameter limit
+NAME_LOOKUP_BATCH = 500
+# Fields a manager can change on a flagged drug
+MODERATED_FIELDS = ("suppressed", "hidden_by_manager", "alternatives")
+
+
+def list_flagged_drugs(db: Session, limit: int, cursor: str = None, risk_level: str = None,
+                       suppressed: bool = None, hidden_by_manager: bool = None) -> tuple:
+    """
+    One page of flagged drugs in id order, filtered server-side; ``limit`` None returns them all.
+
+    Returns:
+        tuple: (rows, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(
+        FlaggedDrug.id, FlaggedDrug.drugname, FlaggedDrug.risk_level, FlaggedDrug.suppressed,
+        FlaggedDrug.alternatives, FlaggedDrug.hidden_by_manager
+    )
+    if risk_level is not None:
+        query = query.filter(FlaggedDrug.risk_level == risk_level)
+    if suppressed is not None:
+        query = query.filter(FlaggedDrug.suppressed == suppressed)
+    if hidden_by_manager is not None:
+        query = query.filter(FlaggedDrug.hidden_by_manager == hidden_by_manager)
+    if cursor:
+        query = query.filter(after_keyset([FlaggedDrug.id], decode_cursor(cursor)))
+
+    query = query.order_by(FlaggedDrug.id)
+    if limit is None:
+        return query.all(), None
+    # One extra row tells us whether another page exists without a COUNT
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1].id])
+    return rows, next_cursor
+
+
+def alternatives_for(drug: DrugRecord, lookup: DrugLookup) -> list:
+    """Alternatives stored when ``drug`` is flagged: same-route low-risk drugs for high-risk drugs."""
+    if drug.risk_level != 'high':
+        return []
+    return lookup.low_risk_on_route(drug.route) or ["No suitable alternatives found"]
+
+
+def _flagged_by_name(db: Session, names: list) -> dict:
+    flagged = {}
+    for start in range(0, len(names), NAME_LOOKUP_BATCH):
+        batch = names[start:start + NAME_LOOKUP_BATCH]
+        flagged.update((f.drugname, f) for f in db.execute(
+            select(FlaggedDrug).where(FlaggedDrug.drugname.in_(batch))).scalars())
+    return flagged
+
+
+def _insert_ignoring_duplicates(db: Session, rows: list) -> set:
+    """
+    Insert ``rows``, skipping names flagged concurrently by another request where the backend supports it.
+
+    Returns:
+        set: The names actually inserted.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        # Without ON CONFLICT a concurrent flag fails the whole insert, so every row that returns went in
+        db.execute(insert(FlaggedDrug), rows)
+        return {row["drugname"] for row in rows}
+    statement = dialect_insert(FlaggedDrug).on_conflict_do_nothing(index_elements=["drugname"])
+    # RETURNING only yields the rows ON CONFLICT DO NOTHING did not skip
+    return set(db.execute(statement.returning(FlaggedDrug.drugname), rows).scalars())
+
+
+def flag_drugs(db: Session, drugnames: list, lookup: DrugLookup) -> list:
+    """
+    Flag every name in ``drugnames`` in one transaction.
+
+    Names are resolved against ``lookup`` and the existing flags in one pass,
+    then all new flags go in with a single multi-row insert.
+
+    Returns:
+        list[dict]: One result per requested name, in request order, with a
+        status of "flagged", "already_flagged", "not_found" or "duplicate".
+    """
+    existing = _flagged_by_name(db, list(dict.fromkeys(drugnames)))
+    results, rows, seen = [], [], set()
+    for name in drugnames:
+        if name in seen:
+            results.append({"drugname": name, "status": "duplicate"})
+            continue
+        seen.add(name)
+        if name in existing:
+            results.append({"drugname": name, "status": "already_flagged", "risk_level": existing[name].risk_level})
+            continue
+        drug = lookup.get(name)
+        if drug is None:
+            results.append({"drugname": name, "status": "not_found"})
+            continue
+        rows.append({
+            "drugname": name,
+            "risk_level": drug.risk_level,
+            "suppressed": False,
+            "alternatives": alternatives_for(drug, lookup),
+            "hidden_by_manager": False
+        })
+        results.append({"drugname": name, "status": "flagged", "risk_level": drug.risk_level})
+
+    if rows:
+        inserted = _insert_ignoring_duplicates(db, rows)
+        if inserted:
+            bump_table_version(db, FLAGGED_DRUGS_TABLE)  # Core inserts bypass the flush hook
+        skipped = [row["drugname"] for row in rows if row["drugname"] not in inserted]
+        if skipped:
+            # Flagged by another request between the lookup above and the insert
+            flagged = _flagged_by_name(db, skipped)
+            for result in results:
+                if result["status"] == "flagged" and result["drugname"] in flagged:
+                    result.update(status="already_flagged", risk_level=flagged[result["drugname"]].risk_level)
+    db.commit()
+    return results
+
+
+def moderate_flagged_drugs(db: Session, items: list) -> list:
+    """
+    Apply manager changes to many flagged drugs in one transaction.
+
+    Args:
+        items (list[dict]): ``{"drugname": ..., <field>: value}`` where fields are any of
+            MODERATED_FIELDS; fields left out (or None) are not changed.
+
+    Returns:
+        list[dict]: One result per item, in request order, with a status of
+        "updated", "not_found" or "duplicate".
+    """
+    flagged = _flagged_by_name(db, list(dict.fromkeys(item["drugname"] for item in items)))
+    results, seen = [], set()
+    for item in items:
+        name = item["drugname"]
+        if name in seen:
+            results.append({"drugname": name, "status": "duplicate"})
+            continue
+        seen.add(name)
+        drug = flagged.get(name)
+        if drug is None:
+            results.append({"drugname": name, "status": "not_found"})
+            continue
+        for field in MODERATED_FIELDS:
+            if item.get(field) is not None:
+                setattr(drug, field, item[field])
+        results.append({"drugname": name, "status": "updated"})
+    db.commit()
+    return results
@@ -0,0 +1,139 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from services.prediction_service import score_records
+
+# Most single predictions scored together in one model call; 1 disables batching
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "64"))
+# How long the first request of a batch waits for company before the batch is scored anyway
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "5"))
+
+_STOP = object()
+
+
+class InferenceBatcher:
+    """
+    Coalesces concurrent single-record predictions into batched model calls.
+
+    Request threads enqueue a record and block on a future. One dispatcher
+    thread takes the first queued record, keeps collecting until the batch
+    holds ``max_batch_size`` records or ``max_wait_ms`` has passed, scores the
+    batch with one ``score_records`` call and resolves every future. A record
+    that makes the batch fail is isolated by rescoring the batch one record
+    at a time, so one bad input only fails its own request.
+    """
+
+    def __init__(self, max_batch_size: int = INFERENCE_BATCH_MAX_SIZE,
+                 max_wait_ms: float = INFERENCE_BATCH_MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.full_flushes = 0
+        self.timeout_flushes = 0
+        self.queue_wait_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def score(self, record: dict) -> tuple:
+        """
+        Predict one record, batched with whatever else is being scored right now.
+
+        Returns:
+            tuple: (risk level, model version), as ``score_records`` reports them.
+        """
+        if not self.enabled:
+            labels, version = score_records([record])
+            return labels[0], version
+        self._ensure_started()
+        future = Future()
+        self._queue.put((record, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._record_batch(batch)
+            self._score_batch(batch)
+
+    def _record_batch(self, batch: list):
+        now = time.perf_counter()
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+            if len(batch) >= self.max_batch_size:
+                self.full_flushes += 1
+            else:
+                self.timeout_flushes += 1
+            self.queue_wait_seconds += sum(now - enqueued_at for _, _, enqueued_at in batch)
+
+    def _score_batch(self, batch: list):
+        try:
+            labels, version = score_records([record for record, _, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for entry in batch:
+                self._score_batch([entry])
+            return
+        for (_, future, _), label in zip(batch, labels):
+            future.set_result((label, version))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "full_flushes": self.full_flushes,
+            "timeout_flushes": self.timeout_flushes,
+            "mean_queue_wait_ms": round(self.queue_wait_seconds / self.requests * 1000, 3) if self.requests else 0.0,
+            "queue_depth": self._queue.qsize()
+        }
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+inference_batcher = InferenceBatcher()
@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from services.utils import ModelArtifacts, load_model_artifacts
+
+# Worker processes used for large scoring batches; 0 keeps all inference in the calling thread
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", "0"))
+# Smaller batches are scored in-process; shipping them to a child costs more than it saves
+INFERENCE_POOL_MIN_ROWS = int(os.getenv("INFERENCE_POOL_MIN_ROWS", "2000"))
+# Rows per task sent to a child
+INFERENCE_POOL_TASK_ROWS = int(os.getenv("INFERENCE_POOL_TASK_ROWS", "1000"))
+
+# Set in each child by _init_worker
+_worker_artifacts = None
+
+
+def _init_worker(model_dir: str, version: str):
+    global _worker_artifacts
+    _worker_artifacts = load_model_artifacts(model_dir, version)
+
+
+def _ping(_) -> int:
+    return os.getpid()
+
+
+def _predict_encoded(version: str, dense: np.ndarray, pts: list) -> np.ndarray:
+    # Runs in a child: the expensive half of the feature pipeline (TF-IDF) plus the model call
+    if _worker_artifacts.version != version:
+        raise RuntimeError(f"Worker holds model version {_worker_artifacts.version}, asked for {version}")
+    return _worker_artifacts.model.predict(_worker_artifacts.pipeline.assemble(dense, pts))
+
+
+class InferencePool:
+    """
+    Optional process pool that spreads large scoring batches over every core.
+
+    Each child loads the model artifacts once, when it starts. The parent runs
+    the cheap half of the feature pipeline (``FeaturePipeline.encode``) and
+    sends each child a dense float block plus the symptom texts for its slice
+    of rows; the child does the TF-IDF transform and ``model.predict`` and
+    returns the encoded labels. The pool belongs to one model version and is
+    replaced the first time a batch is scored with a different one. If the
+    pool breaks (a child killed, out of memory), the batch is scored
+    in-process and a fresh pool is started for the next one.
+    """
+
+    def __init__(self, processes: int = INFERENCE_PROCESSES, min_rows: int = INFERENCE_POOL_MIN_ROWS,
+                 task_rows: int = INFERENCE_POOL_TASK_ROWS):
+        self.processes = processes
+        self.min_rows = min_rows
+        self.task_rows = task_rows
+        self._executor = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.tasks = 0
+        self.rows = 0
+        self.restarts = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def accepts(self, rows: int) -> bool:
+        """Whether a batch of ``rows`` records is worth sending to the pool."""
+        return self.enabled and rows >= self.min_rows
+
+    def _executor_for(self, artifacts: ModelArtifacts, model_dir: str) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._version != artifacts.version:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)  # Tasks already queued on it still finish
+                    self.restarts += 1
+                # spawn, not fork: the API process has live threads whose locks a forked child would inherit
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(os.path.abspath(model_dir), artifacts.version),
+                )
+                self._version = artifacts.version
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._version = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self, artifacts: ModelArtifacts, model_dir: str):
+        """Start every child now so the first large batch does not pay for loading the artifacts."""
+        if not self.enabled:
+            return
+        executor = self._executor_for(artifacts, model_dir)
+        list(executor.map(_ping, range(self.processes)))
+
+    def predict(self, artifacts: ModelArtifacts, model_dir: str, records: list) -> np.ndarray:
+        """
+        Encoded predictions for ``records``, computed across the pool.
+
+        Args:
+            artifacts (ModelArtifacts): The version the caller is scoring with; children load the same one.
+            model_dir (str): Where that version's artifacts live.
+
+        Returns:
+            np.ndarray: ``model.predict`` output in the order of ``records``.
+        """
+        dense, pts = artifacts.pipeline.encode(records)
+        # At least one task per process, so a batch just over min_rows still uses every core
+        step = max(1, min(self.task_rows, -(-len(records) // self.processes)))
+        slices = [slice(start, start + step) for start in range(0, len(records), step)]
+        executor = self._executor_for(artifacts, model_dir)
+        try:
+            futures = [executor.submit(_predict_encoded, artifacts.version, dense[s], pts[s]) for s in slices]
+            parts = [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard(executor)
+            with self._lock:
+                self.fallbacks += 1
+            return artifacts.model.predict(artifacts.pipeline.assemble(dense, pts))
+        with self._lock:
+            self.batches += 1
+            self.tasks += len(slices)
+            self.rows += len(records)
+        return np.concatenate(parts)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "processes": self.processes,
+            "running": self._executor is not None,
+            "model_version": self._version,
+            "min_rows": self.min_rows,
+            "task_rows": self.task_rows,
+            "batches": self.batches,
+            "tasks": self.tasks,
+            "rows": self.rows,
+            "restarts": self.restarts,
+            "fallbacks": self.fallbacks
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor, self._version = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+inference_pool = InferencePool()
@@ -0,0 +1,203 @@
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from database.db import SessionLocal
+from database.models import Job
+
+# Number of jobs that can run at the same time in this process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# How often a worker refreshes the heartbeat of the jobs it owns and looks for abandoned ones
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+# A queued/running job whose heartbeat is older than this belongs to a worker that is gone
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", str(JOB_HEARTBEAT_SECONDS * 3)))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Identifies this process as a job owner; the token tells a restarted process apart from its predecessor
+HOSTNAME = socket.gethostname()
+WORKER_ID = f"{HOSTNAME}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_executor = None
+_heartbeat = None
+_stop_heartbeat = threading.Event()
+
+
+class JobLost(Exception):
+    """The job was marked failed by another worker (its owner looked dead); stop working on it."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _heartbeat
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job-worker")
+    if _heartbeat is None:
+        _stop_heartbeat.clear()
+        _heartbeat = threading.Thread(target=_heartbeat_loop, name="job-heartbeat", daemon=True)
+        _heartbeat.start()
+    return _executor
+
+
+def _owned(job_id: str, *statuses):
+    """WHERE clause matching ``job_id`` only while this worker still owns it in one of ``statuses``."""
+    return (Job.id == job_id, Job.owner == WORKER_ID, Job.status.in_(statuses))
+
+
+def _claim(db: Session, job_id: str, values: dict, *statuses):
+    result = db.execute(update(Job).where(*_owned(job_id, *statuses)).values(**values))
+    db.commit()
+    if result.rowcount == 0:
+        raise JobLost(f"Job {job_id} is no longer owned by this worker")
+
+
+class JobProgress:
+    """Handle passed to a running job so it can persist its progress."""
+
+    def __init__(self, db: Session, job_id: str):
+        self.db = db
+        self.job_id = job_id
+
+    def update(self, processed: int = None, total: int = None, result: dict = None):
+        values = {"heartbeat_at": datetime.utcnow()}
+        if processed is not None:
+            values["processed"] = processed
+        if total is not None:
+            values["total"] = total
+        if result is not None:
+            values["result"] = result
+        # Raises JobLost if another worker already failed the job, so it stops instead of running twice
+        _claim(self.db, self.job_id, values, "running")
+
+
+def _run_job(job_id: str, fn, args: tuple):
+    db = SessionLocal()
+    try:
+        try:
+            _claim(db, job_id, {"status": "running", "started_at": datetime.utcnow(),
+                                "heartbeat_at": datetime.utcnow()}, "queued")
+        except JobLost:
+            return  # Failed as abandoned before it even started
+        try:
+            result = fn(db, JobProgress(db, job_id), *args)
+            values = {"status": "completed", "result": result}
+        except JobLost:
+            db.rollback()
+            return
+        except Exception as e:
+            db.rollback()
+            values = {"status": "failed", "error": str(e)}
+        # Only a job this worker still owns gets a final status; one failed by a sibling stays failed
+        try:
+            _claim(db, job_id, {**values, "finished_at": datetime.utcnow()}, "running")
+        except JobLost:
+            pass
+    finally:
+        db.close()
+
+
+def submit_job(db: Session, kind: str, fn, *args, created_by_id: int = None) -> Job:
+    """
+    Persist a queued job owned by this worker and hand it to the worker pool.
+
+    ``fn`` is called on a worker thread as ``fn(db, progress, *args)`` with a
+    session of its own and a JobProgress handle; its return value is stored
+    as the job's result.
+
+    Returns:
+        Job: The queued job record.
+    """
+    job = Job(id=uuid.uuid4().hex, kind=kind, status="queued", processed=0, created_by_id=created_by_id,
+              owner=WORKER_ID, heartbeat_at=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _get_executor().submit(_run_job, job.id, fn, args)
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Job:
+    return db.get(Job, job_id)
+
+
+def _owner_is_gone(owner: str) -> bool:
+    """Whether ``owner`` is known to be dead without waiting for its heartbeat to go stale."""
+    if not owner:
+        return True
+    host, _, rest = owner.partition(":")
+    pid, _, _ = rest.partition(":")
+    if host != HOSTNAME or not pid.isdigit():
+        return False  # Another machine: only the heartbeat can tell
+    if owner == WORKER_ID:
+        return False
+    if int(pid) == os.getpid():
+        return True  # Same pid, different token: an earlier incarnation of this process
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def fail_interrupted_jobs():
+    """
+    Mark queued/running jobs whose owner is gone as failed.
+
+    A job is abandoned when its heartbeat is older than JOB_STALE_SECONDS or
+    its owner was a process on this host that no longer exists. Jobs owned by
+    live sibling workers are left alone.
+    """
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        candidates = db.query(Job.id, Job.owner, Job.heartbeat_at).filter(Job.status.in_(ACTIVE_STATUSES)).all()
+        others = [job for job in candidates if job.owner != WORKER_ID]
+        stale = [job.id for job in others if job.heartbeat_at is None or job.heartbeat_at < stale_before]
+        dead = [job.id for job in others if job.id not in stale and _owner_is_gone(job.owner)]
+        if stale or dead:
+            # Staleness is re-checked in the UPDATE so a job whose owner just refreshed it is not failed;
+            # a dead owner cannot refresh, so those jobs are failed by id
+            db.execute(
+                update(Job)
+                .where(Job.id.in_(stale + dead), Job.status.in_(ACTIVE_STATUSES),
+                       or_(Job.owner.is_(None), Job.owner != WORKER_ID),
+                       or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale_before, Job.id.in_(dead)))
+                .values(status="failed", error="Interrupted: the worker running it stopped", finished_at=datetime.utcnow())
+            )
+            db.commit()
+    finally:
+        db.close()
+
+
+def _heartbeat_loop():
+    while not _stop_heartbeat.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(Job).where(Job.owner == WORKER_ID, Job.status.in_(ACTIVE_STATUSES))
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                db.commit()
+            finally:
+                db.close()
+            fail_interrupted_jobs()
+        except Exception:
+            pass  # A locked or unreachable database must not kill the heartbeat; try again next tick
+
+
+def shutdown_jobs(wait: bool = True):
+    global _executor, _heartbeat
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+    if _heartbeat is not None:
+        _stop_heartbeat.set()
+        _heartbeat = None
@@ -0,0 +1,224 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Set to "0" to stop recording; /metrics then only reports the component statistics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS_TOTAL = "http_requests_total"
+REQUEST_DURATION = "http_request_duration_seconds"
+REQUESTS_IN_FLIGHT = "http_requests_in_flight"
+STAGE_DURATION = "app_stage_duration_seconds"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    """One thread's counters and histograms; only that thread ever writes to it."""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self):
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [per-bucket counts, sum, count]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    # Full precision: %g would print 1234567 as 1.23457e+06 and make counters look stuck
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and latency histograms in the Prometheus text format, without locks on the hot path.
+
+    Every thread records into a shard of its own (the request threadpool,
+    job workers and the event loop each get one), so recording is a couple of
+    dict operations and never waits on another thread. A scrape adds the
+    shards up. Gauges are counters that also go down: the per-thread deltas
+    sum to the right value even when the increment and decrement happen on
+    different threads. Label sets are tuples of ``(name, value)`` pairs.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, enabled: bool = METRICS_ENABLED):
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()  # Only taken the first time a thread records
+        self._descriptions = {}  # name -> (type, help)
+        self._collectors = []
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._descriptions[name] = (kind, help_text)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1.0):
+        if not self.enabled:
+            return
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        if not self.enabled:
+            return
+        histograms = self._shard().histograms
+        key = (name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the block into ``app_stage_duration_seconds{stage=name}``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE_DURATION, time.perf_counter() - start, (("stage", name),))
+
+    def register_stats(self, component: str, stats):
+        """Export the numeric values of ``stats()`` as ``app_<component>_<key>`` gauges on every scrape."""
+        self._collectors.append((component, stats))
+
+    def _collect(self) -> tuple:
+        counters, histograms = {}, {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # list() copies each dict in one step, so a thread adding a key meanwhile cannot break the loop
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0.0) + value
+            for key, (buckets, total, count) in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+                merged[1] += total
+                merged[2] += count
+        return counters, histograms
+
+    def render(self) -> str:
+        counters, histograms = self._collect()
+        families = {}
+        for (name, labels), value in sorted(counters.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), buckets):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        for component, stats in self._collectors:
+            for key, value in stats().items():
+                if isinstance(value, (bool, int, float)):
+                    name = f"app_{component}_{key}"
+                    self._descriptions.setdefault(name, ("gauge", f"{component} {key.replace('_', ' ')}"))
+                    families[name] = [f"{name} {_format_value(value)}"]
+
+        out = []
+        for name, lines in families.items():
+            kind, help_text = self._descriptions.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe(REQUESTS_TOTAL, "counter", "HTTP requests by method, route template and status code")
+metrics.describe(REQUEST_DURATION, "histogram", "HTTP request latency by method and route template")
+metrics.describe(REQUESTS_IN_FLIGHT, "gauge", "HTTP requests currently being handled")
+metrics.describe(STAGE_DURATION, "histogram", "Time spent in named stages inside request handling")
+
+
+def stage(name: str):
+    return metrics.stage(name)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and in-flight requests.
+
+    Requests are labelled with the matched route's path template (FastAPI puts
+    the route in the scope while routing), so ids in URLs do not create new
+    series; anything that matched no route is counted as "<unmatched>".
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        status_code = 500  # Reported if the app raises before starting a response
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.inc(REQUESTS_IN_FLIGHT)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.registry.inc(REQUESTS_IN_FLIGHT, value=-1.0)
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            labels = (("method", scope["method"]), ("route", route))
+            self.registry.observe(REQUEST_DURATION, elapsed, labels)
+            self.registry.inc(REQUESTS_TOTAL, labels + (("status", str(status_code)),))
+
+
+# Commit time includes the flush the commit triggers
+@event.listens_for(Session, "before_commit")
+def _commit_started(session):
+    session.info["metrics_commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session):
+    started = session.info.pop("metrics_commit_started", None)
+    if started is not None:
+        metrics.observe(STAGE_DURATION, time.perf_counter() - started, (("stage", "db_commit"),))
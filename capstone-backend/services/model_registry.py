@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+from services.utils import ModelArtifacts, load_model_artifacts, MODELS_DIR, MODEL_FILE
+
+# Version name used for artifacts stored directly in models/ (the pre-registry layout)
+DEFAULT_VERSION = "default"
+# Written by activate() so restarted and sibling workers pick up the same version
+ACTIVE_VERSION_FILE = "ACTIVE_VERSION"
+# How often get() looks at ACTIVE_VERSION_FILE for a version activated by another worker
+POINTER_CHECK_SECONDS = float(os.getenv("MODEL_POINTER_CHECK_SECONDS", "5"))
+
+
+class ModelRegistry:
+    """
+    Process-wide holder of the active model version.
+
+    Versions live in ``models/<version>/`` with the same file names as the flat
+    ``models/`` layout, which is still served as the ``default`` version.
+    Nothing is read from disk until the first prediction (or an explicit
+    warm-up). A new version is loaded off to the side and then published with
+    a single reference assignment, so in-flight predictions finish on the
+    artifacts they started with and no request ever waits for a reload.
+    """
+
+    def __init__(self, root: str = MODELS_DIR):
+        self.root = root
+        self._artifacts = None
+        self._lock = threading.Lock()  # Serialises loads; readers never take it once a version is active
+        self._listeners = []
+        self._loading_version = None
+        self._next_pointer_check = 0.0
+
+    def version_dir(self, version: str) -> str:
+        return self.root if version == DEFAULT_VERSION else os.path.join(self.root, version)
+
+    def available_versions(self) -> list:
+        versions = []
+        if os.path.exists(os.path.join(self.root, MODEL_FILE)):
+            versions.append(DEFAULT_VERSION)
+        if os.path.isdir(self.root):
+            versions.extend(sorted(
+                name for name in os.listdir(self.root)
+                if os.path.exists(os.path.join(self.root, name, MODEL_FILE))
+            ))
+        return versions
+
+    def _pointer_path(self) -> str:
+        return os.path.join(self.root, ACTIVE_VERSION_FILE)
+
+    def _read_pointer(self):
+        try:
+            with open(self._pointer_path()) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_pointer(self, version: str):
+        tmp_path = f"{self._pointer_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, self._pointer_path())
+
+    def initial_version(self) -> str:
+        """
+        MODEL_VERSION env var, else the last activated version, else ``default``.
+
+        An uploaded version directory is never picked just for being there;
+        it only goes live through ``activate()``.
+        """
+        versions = self.available_versions()
+        for candidate in (os.getenv("MODEL_VERSION"), self._read_pointer(), DEFAULT_VERSION):
+            if candidate and candidate in versions:
+                return candidate
+        raise FileNotFoundError(
+            f"No model artifacts in {self.root}/ and no activated version; activate one of {versions or 'none found'}"
+        )
+
+    def get(self) -> ModelArtifacts:
+        artifacts = self._artifacts
+        if artifacts is None:
+            with self._lock:
+                if self._artifacts is None:
+                    version = self.initial_version()
+                    self._artifacts = load_model_artifacts(self.version_dir(version), version)
+                artifacts = self._artifacts
+        self._follow_pointer()
+        return artifacts
+
+    @property
+    def loaded(self) -> bool:
+        return self._artifacts is not None
+
+    @property
+    def active_version(self):
+        return self._artifacts.version if self._artifacts else None
+
+    @property
+    def loading_version(self):
+        return self._loading_version
+
+    def add_listener(self, callback):
+        """Register ``callback(artifacts)``, called after every version swap."""
+        self._listeners.append(callback)
+
+    def activate(self, version: str, persist: bool = True) -> ModelArtifacts:
+        """
+        Load ``version`` and atomically make it the active model.
+
+        Args:
+            version (str): A name from ``available_versions()``.
+            persist (bool): Record the choice so other workers and restarts follow it.
+        """
+        if version not in self.available_versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        with self._lock:
+            self._loading_version = version
+            try:
+                artifacts = load_model_artifacts(self.version_dir(version), version)
+                self._artifacts = artifacts  # The swap: one reference assignment
+            finally:
+                self._loading_version = None
+        if persist:
+            self._write_pointer(version)
+        for callback in self._listeners:
+            callback(artifacts)
+        return artifacts
+
+    def _follow_pointer(self):
+        now = time.monotonic()
+        if now < self._next_pointer_check:
+            return
+        self._next_pointer_check = now + POINTER_CHECK_SECONDS
+        version = self._read_pointer()
+        if version and version != self.active_version and self._loading_version is None:
+            threading.Thread(target=self._activate_quietly, args=(version,), daemon=True).start()
+
+    def _activate_quietly(self, version: str):
+        try:
+            self.activate(version, persist=False)
+        except Exception:
+            pass  # A bad pointer must not take down the worker; keep serving the current version
+
+
+model_registry = ModelRegistry()
+
+
+def model_load_job(db, progress, version: str) -> dict:
+    """Job entry point: load ``version`` in the background and swap it in."""
+    model_registry.activate(version)
+    return {"version": version}
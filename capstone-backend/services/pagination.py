@@ -0,0 +1,51 @@
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+
+def page_size(limit: int = None, cursor: str = None):
+    """
+    Rows to return for a listing endpoint.
+
+    Clients that send neither ``limit`` nor ``cursor`` predate paging and get
+    the whole list (None); a cursor alone continues at DEFAULT_PAGE_SIZE.
+    """
+    if limit is None and not cursor:
+        return None
+    return limit or DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque cursor for the sort-key values of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def after_keyset(columns: list, values: list):
+    """
+    WHERE clause selecting rows strictly after ``values`` in ascending ``columns`` order.
+
+    Written as nested OR/AND rather than a row-value comparison so it works on
+    every backend and still lets the index on ``columns`` drive the range scan.
+    """
+    if len(columns) != len(values):
+        raise ValueError("Invalid cursor")
+    clause = columns[-1] > values[-1]
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        clause = or_(column > value, and_(column == value, clause))
+    return clause
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from services.metrics import stage
+
+# bcrypt cost factor for new hashes; stored hashes with any other cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Threads that run bcrypt; each one keeps a core busy for the length of a hash
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+# Hashes allowed to be running or queued at once; further callers are turned away immediately
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "16"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordServiceBusy(RuntimeError):
+    """Raised when the hashing pool is saturated; the request should be retried later."""
+
+
+class PasswordService:
+    """
+    The single place passwords are hashed and checked.
+
+    bcrypt runs on its own small thread pool, so a burst of logins can use at
+    most ``workers`` cores. Admission is capped at ``max_pending`` hashes and
+    checked without waiting; beyond that, callers get ``PasswordServiceBusy``
+    instead of queueing. The ``*_async`` methods are for the unauthenticated
+    login and signup endpoints: they await the hash on the event loop, so a
+    login storm holds no request threads while bcrypt runs.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, max_pending: int = PASSWORD_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    def _admit(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordServiceBusy("Too many concurrent password operations")
+
+    def _release(self):
+        self._slots.release()
+        with self._lock:
+            self.completed += 1
+
+    def _run(self, fn, *args):
+        self._admit()
+        try:
+            with stage("bcrypt"):
+                return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    async def _run_async(self, fn, *args):
+        self._admit()
+        try:
+            with stage("bcrypt"):
+                return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            self._release()
+
+    def hash(self, password: str) -> str:
+        return self._run(pwd_context.hash, password)
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(pwd_context.hash, password)
+
+    def verify(self, password: str, hashed: str) -> tuple:
+        """
+        Check ``password`` against ``hashed``.
+
+        Returns:
+            tuple: (verified, new_hash) where new_hash is a re-hash under the current
+            cost settings if the stored hash is outdated, otherwise None.
+        """
+        if not hashed:
+            return False, None
+        return self._run(pwd_context.verify_and_update, password, hashed)
+
+    async def verify_async(self, password: str, hashed: str) -> tuple:
+        if not hashed:
+            return False, None
+        return await self._run_async(pwd_context.verify_and_update, password, hashed)
+
+    def _store_rehash(self, db, user, new_hash: str):
+        user.password = new_hash
+        db.commit()
+        db.refresh(user)  # Reload here so callers on the event loop never trigger a lazy load
+        with self._lock:
+            self.rehashed += 1
+
+    def verify_user(self, db, user, password: str) -> bool:
+        """Verify ``user``'s password and persist an upgraded hash when the cost settings changed."""
+        verified, new_hash = self.verify(password, user.password)
+        if verified and new_hash:
+            self._store_rehash(db, user, new_hash)
+        return verified
+
+    async def verify_user_async(self, db, user, password: str) -> bool:
+        verified, new_hash = await self.verify_async(password, user.password)
+        if verified and new_hash:
+            await run_in_threadpool(self._store_rehash, db, user, new_hash)
+        return verified
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+password_service = PasswordService()
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from services.feature_pipeline import categorical_cols
+
+# Maximum number of cached predictions; 0 disables the cache
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "50000"))
+# Seconds a cached prediction stays valid; 0 means until evicted or the model changes
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "0"))
+
+
+def feature_key(record: dict) -> bytes:
+    """
+    Canonical digest of the fields the model actually reads.
+
+    Name, active ingredient and outcome do not influence the prediction, so
+    records differing only in those share a key.
+    """
+    pt = record.get('pt')
+    canonical = (
+        pt if isinstance(pt, str) else '',
+        float(record['dose_amt']),
+        float(record['nda_num']),
+        str(record['role_cod']),
+    ) + tuple(str(record[col]) for col in categorical_cols)
+    return hashlib.blake2b(repr(canonical).encode(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """Thread-safe LRU of risk levels keyed by (model version, feature digest), with optional TTL."""
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_SIZE, ttl: float = PREDICTION_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (version, key) -> (risk_level, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, version: str, keys: list) -> dict:
+        """Cached risk levels for ``keys`` under ``version``, as {key: risk_level}; absent keys are misses."""
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((version, key))
+                if entry is not None and (entry[1] is None or entry[1] > now):
+                    self._entries.move_to_end((version, key))
+                    found[key] = entry[0]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._entries[(version, key)]
+                    self.misses += 1
+        return found
+
+    def put_many(self, version: str, items: dict):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            for key, risk_level in items.items():
+                self._entries[(version, key)] = (risk_level, expires_at)
+                self._entries.move_to_end((version, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+prediction_cache = PredictionCache()
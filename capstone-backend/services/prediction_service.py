@@ -1,110 +1,161 @@
+import os
+
 import pandas as pd
-import joblib
-from sklearn.preprocessing import LabelEncoder
-
-# Load model and components
-model = joblib.load("models/drug_model.pkl")
-tfidf = joblib.load("models/tfidf.pkl")
-scaler = joblib.load("models/scaler.pkl")
-label_encoder = joblib.load("models/label_encoder.pkl")
-encoders = joblib.load("models/encoders.pkl")  # Dict of LabelEncoders for categorical fields
-feature_cols = joblib.load("models/feature_cols.pkl")  # List of all final feature columns
-
-# Keep the full cleaned dataset for alternative recommendations
-df_clean = pd.read_csv("models/df_clean.csv")  # Ensure this file exists
-
-# Columns expected in synthetic data input
-categorical_cols = ['route', 'dose_unit', 'dose_form', 'dose_freq', 'dechal', 'rechal']
-numeric_cols = ['dose_amt', 'nda_num', 'num_symptoms', 'primary_dose']
-
-
-def preprocess_input(data: dict) -> pd.DataFrame:
-    # Prepare DataFrame from input dict
-    df = pd.DataFrame([data])
-
-    # Handle unseen categorical values
-    for col in categorical_cols:
-        if col in df:
-            # Transform using encoder if column exists
-            if col in encoders:
-                # Get all known classes
-                known_classes = set(encoders[col].classes_)
-                # Replace unseen values with 'Unknown'
-                df[col] = df[col].apply(lambda x: x if x in known_classes else 'Unknown')
-                # Now encode
-                df[col] = encoders[col].transform(df[col].astype(str))
-            else:
-                # If no encoder exists, keep as-is
-                pass
-
-    # Rest of your preprocessing remains the same...
-    df['num_symptoms'] = df['pt'].apply(lambda x: len(x.split(',')) if x else 0)
-    df['is_primary'] = (df['role_cod'] == 'PS').astype(int)
-    df['primary_dose'] = df['is_primary'] * df['dose_amt']
-
-    # TF-IDF vector
-    pt_tfidf = tfidf.transform(df['pt']).toarray()
-    tfidf_df = pd.DataFrame(pt_tfidf, columns=[f'tfidf_{term}' for term in tfidf.get_feature_names_out()])
-    df = pd.concat([df, tfidf_df], axis=1)
-
-    # Final feature selection
-    X = df[feature_cols]
-
-    # Scale numeric columns
-    if len(numeric_cols) > 0:
-        X[numeric_cols] = scaler.transform(X[numeric_cols])
-
-    return X
+from scipy import sparse
+
+from services.alternatives_index import AlternativesIndex, split_symptoms
+from services.catalog import drug_catalog
+from services.dataset import get_dataset
+from services.drug_lookup import DrugLookup
+from services.inference_pool import inference_pool
+from services.metrics import stage
+from services.model_registry import model_registry
+from services.prediction_cache import prediction_cache, feature_key
+from services.search_index import DrugSearchIndex
+
+# Set to "1" to load the model, dataset and indexes at startup instead of on first use
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "0") == "1"
+
+# Cached predictions belong to the model that made them
+model_registry.add_listener(lambda artifacts: prediction_cache.clear())
+
+# Alternative recommendations, search and exact lookups all read drug_catalog: the dataset plus the drugs table
+
+
+def get_alternatives_index() -> AlternativesIndex:
+    return drug_catalog.alternatives_index()
+
+
+def get_search_index() -> DrugSearchIndex:
+    """Search index shared by the doctor and production search endpoints."""
+    return drug_catalog.search_index()
+
+
+def get_drug_lookup() -> DrugLookup:
+    """Exact drug name lookups used by flagging."""
+    return drug_catalog.lookup()
+
+
+def warm_up():
+    """Load everything the prediction, search and alternatives paths need up front."""
+    artifacts = model_registry.get()
+    inference_pool.start(artifacts, model_registry.version_dir(artifacts.version))
+    drug_catalog.load()
+
+
+def preprocess_inputs(records: list) -> sparse.csr_matrix:
+    return model_registry.get().pipeline.transform(records)
+
+
+def preprocess_input(data: dict) -> sparse.csr_matrix:
+    return preprocess_inputs([data])
+
+
+def score_records(records: list[dict]) -> tuple:
+    """
+    Score a batch of drug records with a single model call.
+
+    The artifacts are read once, so the whole batch is scored by one model
+    version even if a new version is swapped in meanwhile. Records whose
+    features were scored before come from the prediction cache, and duplicate
+    records within the batch are only scored once. Large batches are spread
+    over the inference process pool when one is configured.
+
+    Args:
+        records (list[dict]): Input feature dicts, one per drug.
+
+    Returns:
+        tuple: (list of predicted risk levels in the order of ``records``, model version used).
+    """
+    artifacts = model_registry.get()
+    if not records:
+        return [], artifacts.version
+
+    keys = [feature_key(record) for record in records]
+    predictions = prediction_cache.get_many(artifacts.version, list(dict.fromkeys(keys)))
+    pending = {}  # key -> first record with that key, for everything not cached
+    for key, record in zip(keys, records):
+        if key not in predictions and key not in pending:
+            pending[key] = record
+
+    if pending:
+        if inference_pool.accepts(len(pending)):
+            with stage("pool_predict"):
+                pred_encoded = inference_pool.predict(
+                    artifacts, model_registry.version_dir(artifacts.version), list(pending.values()))
+        else:
+            with stage("feature_build"):
+                X_processed = artifacts.pipeline.transform(list(pending.values()))
+            with stage("model_predict"):
+                pred_encoded = artifacts.model.predict(X_processed)
+        scored = dict(zip(pending, artifacts.label_encoder.inverse_transform(pred_encoded).tolist()))
+        prediction_cache.put_many(artifacts.version, scored)
+        predictions.update(scored)
+
+    return [predictions[key] for key in keys], artifacts.version
+
+
+def predict_risk_levels(records: list[dict]) -> list[str]:
+    return score_records(records)[0]
 
 
 def predict_risk_level(input_data: dict) -> str:
-    X_processed = preprocess_input(input_data)
-    pred_encoded = model.predict(X_processed)[0]
-    return label_encoder.inverse_transform([pred_encoded])[0]
+    return predict_risk_levels([input_data])[0]
+
 
+def _catalog_match(drug_name: str):
+    """The catalog record for ``drug_name``: an exact name, else the first search hit."""
+    lookup = get_drug_lookup()
+    record = lookup.get(drug_name)
+    if record is None:
+        hits = get_search_index().search(drug_name, limit=1)
+        record = lookup.get(hits[0]["drugname"]) if hits else None
+    return record
 
-def recommend_alternatives(drug_name: str, df_clean: pd.DataFrame):
+
+def recommend_alternatives(drug_name: str, df_clean: pd.DataFrame = None):
     """
     Recommend low-risk alternatives for a given drug name based on precomputed risk level and symptoms.
 
     Args:
         drug_name (str): The name of the drug to evaluate.
-        df_clean (pd.DataFrame): Cleaned dataset with precomputed risk levels.
+        df_clean (pd.DataFrame, optional): Cleaned dataset with precomputed risk levels.
+            Defaults to the shared dataset.
 
     Returns:
         dict: Contains 'risk_level' and 'alternatives' list.
     """
-    # Find all matching rows for the drug_name
-    matching_rows = df_clean[df_clean['drugname'].str.contains(drug_name, case=False, na=False)]
-    if matching_rows.empty:
-        return {
-            "risk_level": "unknown",
-            "alternatives": [f"No data found for {drug_name}"]
-        }
+    if df_clean is None:
+        df_clean = get_dataset()
 
-    # Use the most frequent row or first row if no frequency data
-    matching_row = matching_rows.mode().iloc[0] if not matching_rows.empty else matching_rows.iloc[0]
+    # Find all matching rows for the drug_name
+    with stage("dataset_scan"):
+        matching_rows = df_clean[df_clean['drugname'].str.contains(drug_name, case=False, na=False)]
+        # Use the most frequent row or first row if no frequency data
+        matching_row = matching_rows.mode().iloc[0] if not matching_rows.empty else None
+    if matching_row is not None:
+        risk_level, pt, route = matching_row['risk_level'], matching_row['pt'], matching_row['route']
+    else:
+        # Drugs added through the admin endpoints are only in the catalog
+        record = _catalog_match(drug_name)
+        if record is None:
+            return {
+                "risk_level": "unknown",
+                "alternatives": [f"No data found for {drug_name}"]
+            }
+        risk_level, pt, route = record.risk_level, record.pt, record.route
 
     # Get precomputed risk level
-    risk_level = matching_row['risk_level']
     print(f"Precomputed risk level for {drug_name}: {risk_level}")
 
     # Derive alternatives based on symptoms and route compatibility
     alternatives = []
     if risk_level == 'high':
-        high_risk_symptoms = [s.strip() for s in matching_row['pt'].split(',')] if pd.notna(matching_row['pt']) else []
-        high_risk_route = matching_row['route']
+        high_risk_symptoms = split_symptoms(pt) if pd.notna(pt) else []
+        high_risk_route = route
         if high_risk_symptoms:
-            low_risk_options = df_clean[df_clean['risk_level'] == 'low']
-            matching_drugs = set()  # Use set to avoid duplicates
-            for idx, row in low_risk_options.iterrows():
-                if pd.notna(row['pt']):
-                    low_risk_symptoms = [s.strip() for s in row['pt'].split(',')]
-                    # Check for significant symptom overlap (e.g., at least 50% match) and route compatibility
-                    common_symptoms = set(high_risk_symptoms) & set(low_risk_symptoms)
-                    if (len(common_symptoms) / len(high_risk_symptoms) >= 0.5 and
-                            row['route'] == high_risk_route):
-                        matching_drugs.add(row['drugname'])
+            # Low-risk drugs on the same route with at least 50% symptom overlap
+            matching_drugs = get_alternatives_index().find(high_risk_route, high_risk_symptoms)
             alternatives = list(matching_drugs)[:5] if matching_drugs else ["No suitable alternatives found"]
         else:
             alternatives = ["No symptoms data for this drug"]
@@ -0,0 +1,116 @@
+import os
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from database.models import Drug, Job
+from services.bulk_upload import NUMERIC_DEFAULTS, TEXT_DEFAULTS
+from services.catalog import drug_catalog, next_catalog_seq
+from services.jobs import ACTIVE_STATUSES
+from services.model_registry import model_registry
+from services.prediction_cache import feature_key
+from services.prediction_service import score_records
+
+# Drugs read, and the stale ones among them re-scored and updated, per transaction
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "5000"))
+
+RESCORE_JOB_KIND = "rescore"
+
+_COLUMNS = [Drug.id, Drug.name, Drug.prod_ai, Drug.risk_level, Drug.model_version, Drug.feature_hash] + [
+    getattr(Drug, col) for col in list(TEXT_DEFAULTS) + list(NUMERIC_DEFAULTS)
+]
+
+
+def drug_features(row) -> dict:
+    """Feature dict for a stored drug, with the upload defaults standing in for NULL columns."""
+    features = {"drugname": row.name, "prod_ai": row.prod_ai}
+    for col, default in {**TEXT_DEFAULTS, **NUMERIC_DEFAULTS}.items():
+        value = getattr(row, col)
+        features[col] = default if value is None else value
+    return features
+
+
+def rescore_catalog(db: Session, start_after: int = 0, chunk_size: int = RESCORE_CHUNK_SIZE, on_chunk=None) -> dict:
+    """
+    Bring every stored risk level up to date with the active model.
+
+    Drugs are read in id order by keyset, ``chunk_size`` at a time. A row is
+    stale when its model_version is not the active version or its
+    feature_hash does not match its feature columns (NULL for rows written
+    before hashes were stored). Only stale rows are scored, with one
+    ``score_records`` call per chunk, and they are written back with bulk
+    UPDATEs by primary key before the chunk commits. An interrupted run
+    therefore loses at most one chunk: running again skips everything
+    already brought up to date, and ``start_after`` (the last id reported)
+    skips reading it too.
+
+    Args:
+        on_chunk (callable, optional): Called with the running summary after every committed chunk.
+
+    Returns:
+        dict: Rows scanned, rescored and changed (new risk level), the last id
+        reached and the model versions used.
+    """
+    summary = {"scanned": 0, "rescored": 0, "changed": 0, "last_id": start_after, "model_versions": []}
+    while True:
+        rows = db.execute(
+            select(*_COLUMNS).where(Drug.id > summary["last_id"]).order_by(Drug.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        active_version = model_registry.get().version
+        stale = []
+        for row in rows:
+            features = drug_features(row)
+            digest = feature_key(features).hex()
+            if row.model_version != active_version or row.feature_hash != digest:
+                stale.append((row, features, digest))
+
+        changed, unchanged = [], []
+        if stale:
+            labels, version = score_records([features for _, features, _ in stale])
+            for (row, _, digest), label in zip(stale, labels):
+                values = {"id": row.id, "risk_level": label, "model_version": version, "feature_hash": digest}
+                (changed if label != row.risk_level else unchanged).append(values)
+            if changed:
+                # Only a new risk level matters to the catalog, so only those rows are stamped
+                seq = next_catalog_seq(db)
+                for values in changed:
+                    values["catalog_seq"] = seq
+            for group in (changed, unchanged):
+                if group:
+                    db.execute(update(Drug), group)
+            summary["rescored"] += len(stale)
+            summary["changed"] += len(changed)
+            if version not in summary["model_versions"]:
+                summary["model_versions"].append(version)
+        summary["scanned"] += len(rows)
+        summary["last_id"] = rows[-1].id
+        db.commit()
+        if changed:
+            drug_catalog.changed()
+        if on_chunk:
+            on_chunk(summary)
+    return summary
+
+
+def resume_point(job: Job) -> int:
+    """Id a new run should start after to pick up where an interrupted re-scoring job stopped."""
+    if job.kind != RESCORE_JOB_KIND:
+        raise ValueError(f"Job {job.id} is not a re-scoring job")
+    if job.status != "failed":
+        raise ValueError(f"Only failed or interrupted jobs can be resumed; job {job.id} is {job.status}")
+    return (job.result or {}).get("last_id", 0)
+
+
+def active_rescore_job(db: Session):
+    return db.query(Job).filter(Job.kind == RESCORE_JOB_KIND, Job.status.in_(ACTIVE_STATUSES)).first()
+
+
+def rescore_job(db: Session, progress, start_after: int = 0) -> dict:
+    """Job entry point: rescore_catalog with the summary checkpointed into the job after every chunk."""
+    progress.update(total=db.scalar(select(func.count()).select_from(Drug).where(Drug.id > start_after)))
+    return rescore_catalog(db, start_after, on_chunk=lambda summary: progress.update(
+        processed=summary["scanned"], result={**summary, "model_versions": list(summary["model_versions"])}
+    ))
@@ -0,0 +1,128 @@
+import heapq
+from bisect import bisect_left, insort
+
+import pandas as pd
+
+NGRAM = 3
+SEARCH_LIMIT = 15
+
+
+def _ngrams(text: str) -> set:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class DrugSearchIndex:
+    """
+    Case-insensitive substring search over the distinct drug names.
+
+    Names are stored once. ``ordered`` holds ``(lower-cased name, name, id)``
+    sorted, so prefix matches are a contiguous slice found by bisection. The
+    names the index is built with get ids in that same order, which keeps
+    every trigram posting list alphabetical and lets infix search stop at the
+    first ``limit`` verified hits. Names added later get the next free id;
+    posting lists they are appended to are remembered, and infix search over
+    those ranks all of its hits instead of stopping early.
+    """
+
+    def __init__(self, names: list, risk_levels: list):
+        order = sorted(range(len(names)), key=lambda i: (names[i].lower(), names[i]))
+        self.names = [names[i] for i in order]
+        self.risk_levels = [risk_levels[i] for i in order]
+        self.lower = [name.lower() for name in self.names]
+        self.ids = {name: name_id for name_id, name in enumerate(self.names)}
+        self.ordered = [(lower, name, name_id) for name_id, (lower, name) in enumerate(zip(self.lower, self.names))]
+        self.postings = {}  # trigram -> [name ids]
+        self._unordered_grams = set()  # Trigrams whose posting list is no longer alphabetical
+        for name_id, name in enumerate(self.lower):
+            for gram in _ngrams(name):
+                self.postings.setdefault(gram, []).append(name_id)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DrugSearchIndex":
+        # First row per drug name wins, as drop_duplicates('drugname') did
+        distinct = df.loc[df['drugname'].notna(), ['drugname', 'risk_level']].drop_duplicates('drugname')
+        return cls(distinct['drugname'].astype(str).tolist(), distinct['risk_level'].tolist())
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_many(self, entries: list) -> list:
+        """
+        Add ``(name, risk_level)`` pairs; names already indexed keep their entry, as in ``from_frame``.
+
+        Readers are never blocked: everything a new id points at is in place
+        before the id is published, and the sorted list is swapped in whole.
+
+        Returns:
+            list: The names that were added.
+        """
+        added = []
+        for name, risk_level in entries:
+            if name in self.ids:
+                continue
+            name_id = len(self.names)
+            lower = name.lower()
+            self.names.append(name)
+            self.risk_levels.append(risk_level)
+            self.lower.append(lower)
+            self.ids[name] = name_id
+            for gram in _ngrams(lower):
+                self.postings.setdefault(gram, []).append(name_id)
+                self._unordered_grams.add(gram)
+            added.append((lower, name, name_id))
+        if len(added) == 1:
+            ordered = list(self.ordered)
+            insort(ordered, added[0])
+            self.ordered = ordered
+        elif added:
+            self.ordered = list(heapq.merge(self.ordered, sorted(added)))
+        return [name for _, name, _ in added]
+
+    def set_risk_level(self, name: str, risk_level: str):
+        name_id = self.ids.get(name)
+        if name_id is not None:
+            self.risk_levels[name_id] = risk_level
+
+    def _prefix_ids(self, query: str):
+        ordered = self.ordered
+        for position in range(bisect_left(ordered, (query,)), len(ordered)):
+            lower, _, name_id = ordered[position]
+            if not lower.startswith(query):
+                break
+            yield name_id
+
+    def _infix_candidates(self, query: str) -> tuple:
+        """Candidate ids for an infix match and whether they come in alphabetical order."""
+        if len(query) < NGRAM:
+            return (name_id for _, _, name_id in self.ordered), True
+        # The rarest trigram bounds the candidate set; each candidate is verified below
+        gram = min(_ngrams(query), key=lambda g: len(self.postings.get(g, ())))
+        return self.postings.get(gram, ()), gram not in self._unordered_grams
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list:
+        """
+        Drugs whose name contains ``query`` (case-insensitive), prefix matches first.
+
+        Returns:
+            list[dict]: Up to ``limit`` ``{"drugname", "risk_level"}`` records.
+        """
+        query = query.lower()
+        if not query:
+            return []
+        hits = []
+        for name_id in self._prefix_ids(query):
+            if len(hits) == limit:
+                break
+            hits.append(name_id)
+        if len(hits) < limit:
+            candidates, alphabetical = self._infix_candidates(query)
+            matches = (
+                name_id for name_id in candidates
+                if query in self.lower[name_id] and not self.lower[name_id].startswith(query)
+            )
+            wanted = limit - len(hits)
+            if alphabetical:
+                hits.extend(name_id for _, name_id in zip(range(wanted), matches))
+            else:
+                hits.extend(heapq.nsmallest(wanted, matches, key=lambda i: (self.lower[i], self.names[i])))
+        return [{"drugname": self.names[i], "risk_level": self.risk_levels[i]} for i in hits]
@@ -0,0 +1,59 @@
+import hashlib
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from database.models import TableVersion
+
+# Tables whose writes bump a row in table_versions
+VERSIONED_TABLES = {"flagged_drugs"}
+
+
+def get_table_version(db: Session, name: str) -> int:
+    version = db.query(TableVersion.version).filter(TableVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_table_version(db: Session, name: str):
+    """
+    Increment ``name``'s version in the caller's transaction.
+
+    ORM inserts, updates and deletes are counted automatically; call this
+    directly after bulk ``query.update()``/``delete()`` statements, which
+    bypass the flush.
+    """
+    result = db.execute(
+        update(TableVersion).where(TableVersion.name == name).values(version=TableVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(TableVersion).values(name=name, version=1))
+
+
+def next_table_version(db: Session, name: str) -> int:
+    """Bump ``name`` and return its new version, for stamping the rows written in the same transaction."""
+    bump_table_version(db, name)
+    return get_table_version(db, name)
+
+
+def etag_for(name: str, version: int, *variant) -> str:
+    """Strong ETag for a representation of ``name`` at ``version``; ``variant`` covers query parameters."""
+    digest = hashlib.blake2b(repr(variant).encode(), digest_size=8).hexdigest()
+    return f'"{name}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_versions_on_flush(session, flush_context):
+    touched = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if getattr(obj, "__table__", None) is not None and obj.__table__.name in VERSIONED_TABLES
+    }
+    for name in touched:
+        bump_table_version(session, name)
@@ -0,0 +1,78 @@
+import hashlib
+import io
+import threading
+
+import pandas as pd
+
+from services.bulk_upload import REQUIRED_COLUMNS, TEXT_DEFAULTS, NUMERIC_DEFAULTS
+
+# Header order of the template sheet
+TEMPLATE_COLUMNS = [
+    "name", "prod_ai", "pt", "outc_cod", "dose_amt", "nda_num", "route",
+    "dose_unit", "dose_form", "dose_freq", "dechal", "rechal", "role_cod",
+]
+
+TEMPLATE_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class UploadTemplate:
+    """One rendered template file, kept in memory."""
+
+    def __init__(self, content: bytes, fmt: str, etag: str):
+        self.content = content
+        self.media_type = TEMPLATE_FORMATS[fmt]
+        self.filename = f"drug_template.{fmt}"
+        self.etag = etag
+
+
+def _template_frame() -> pd.DataFrame:
+    # One example row: blanks for required fields, the upload defaults for the rest
+    row = {col: "" for col in REQUIRED_COLUMNS}
+    row.update(TEXT_DEFAULTS)
+    row.update({col: int(value) for col, value in NUMERIC_DEFAULTS.items()})
+    return pd.DataFrame([{col: row[col] for col in TEMPLATE_COLUMNS}])
+
+
+def _render(fmt: str) -> bytes:
+    df = _template_frame()
+    buffer = io.BytesIO()
+    if fmt == "xlsx":
+        df.to_excel(buffer, index=False)
+    elif fmt == "csv":
+        df.to_csv(buffer, index=False)
+    else:
+        try:
+            df.to_parquet(buffer, index=False)
+        except ImportError:
+            raise ValueError("Parquet templates require the 'pyarrow' package")
+    return buffer.getvalue()
+
+
+_templates = {}
+_lock = threading.Lock()
+
+
+def get_upload_template(fmt: str = "xlsx") -> UploadTemplate:
+    """
+    The bulk-upload template in ``fmt``, rendered on first request and then served from memory.
+
+    The ETag is derived from the template's definition rather than the file
+    bytes (xlsx embeds a creation time), so every worker hands out the same
+    tag and it only changes when the columns or defaults do.
+    """
+    if fmt not in TEMPLATE_FORMATS:
+        raise ValueError(f"Unsupported template format '{fmt}'. Use one of: {', '.join(TEMPLATE_FORMATS)}")
+    template = _templates.get(fmt)
+    if template is None:
+        with _lock:
+            template = _templates.get(fmt)
+            if template is None:
+                definition = repr((fmt, TEMPLATE_COLUMNS, REQUIRED_COLUMNS, TEXT_DEFAULTS, NUMERIC_DEFAULTS))
+                etag = f'"template-{hashlib.blake2b(definition.encode(), digest_size=8).hexdigest()}"'
+                template = UploadTemplate(_render(fmt), fmt, etag)
+                _templates[fmt] = template
+    return template
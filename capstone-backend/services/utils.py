@@ -1,21 +1,80 @@
-import pandas as pd
 import joblib
 import os
+import threading
+import warnings
 
-MODEL_PATH = "models/drug_model.pkl"
-TFIDF_PATH = "models/tfidf.pkl"
-SCALER_PATH = "models/scaler.pkl"
-ENCODERS_PATH = "models/encoders.pkl"
-LABEL_ENCODER_PATH = "models/label_encoder.pkl"
-FEATURE_COLS_PATH = "models/feature_cols.pkl"
-DF_CLEAN_PATH = "models/df_clean.csv"
-
-def load_model_artifacts():
-    model = joblib.load(MODEL_PATH)
-    tfidf = joblib.load(TFIDF_PATH)
-    scaler = joblib.load(SCALER_PATH)
-    encoders = joblib.load(ENCODERS_PATH)
-    label_encoder = joblib.load(LABEL_ENCODER_PATH)
-    feature_cols = joblib.load(FEATURE_COLS_PATH)
-    df_clean = pd.read_csv(DF_CLEAN_PATH)
-    return model, tfidf, scaler, encoders, label_encoder, feature_cols, df_clean
+from services.feature_pipeline import FeaturePipeline
+
+MODELS_DIR = "models"
+MODEL_FILE = "drug_model.pkl"
+TFIDF_FILE = "tfidf.pkl"
+SCALER_FILE = "scaler.pkl"
+ENCODERS_FILE = "encoders.pkl"
+LABEL_ENCODER_FILE = "label_encoder.pkl"
+FEATURE_COLS_FILE = "feature_cols.pkl"
+
+MODEL_PATH = os.path.join(MODELS_DIR, MODEL_FILE)
+TFIDF_PATH = os.path.join(MODELS_DIR, TFIDF_FILE)
+SCALER_PATH = os.path.join(MODELS_DIR, SCALER_FILE)
+ENCODERS_PATH = os.path.join(MODELS_DIR, ENCODERS_FILE)
+LABEL_ENCODER_PATH = os.path.join(MODELS_DIR, LABEL_ENCODER_FILE)
+FEATURE_COLS_PATH = os.path.join(MODELS_DIR, FEATURE_COLS_FILE)
+
+
+class LazyResource:
+    """Builds a value with ``factory`` on first ``get()``; concurrent first callers share one build."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._value = self._factory()
+                    self._loaded = True
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+
+# FeaturePipeline hands the model a sparse matrix whose columns are already in the fitted order
+# (checked in ModelArtifacts), so sklearn's complaint that it carries no column names is noise
+# on every predict. Filtered once per process rather than with catch_warnings() around each
+# call, which is not thread-safe; importing this module installs it in pool children too.
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning,
+                        module="sklearn")
+
+
+class ModelArtifacts:
+    """One consistent set of fitted artifacts plus the FeaturePipeline derived from them."""
+
+    def __init__(self, model, tfidf, scaler, encoders, label_encoder, feature_cols, version: str = None):
+        self.version = version
+        self.model = model
+        self.tfidf = tfidf
+        self.scaler = scaler
+        self.encoders = encoders  # Dict of LabelEncoders for categorical fields
+        self.label_encoder = label_encoder
+        self.feature_cols = feature_cols  # List of all final feature columns
+        fitted_cols = getattr(model, 'feature_names_in_', None)
+        if fitted_cols is not None and list(fitted_cols) != list(feature_cols):
+            raise ValueError("feature_cols does not match the column order the model was fitted with")
+        self.pipeline = FeaturePipeline(tfidf, scaler, encoders, feature_cols)
+
+
+def load_model_artifacts(model_dir: str = MODELS_DIR, version: str = None) -> ModelArtifacts:
+    return ModelArtifacts(
+        version=version,
+        model=joblib.load(os.path.join(model_dir, MODEL_FILE)),
+        tfidf=joblib.load(os.path.join(model_dir, TFIDF_FILE)),
+        scaler=joblib.load(os.path.join(model_dir, SCALER_FILE)),
+        encoders=joblib.load(os.path.join(model_dir, ENCODERS_FILE)),
+        label_encoder=joblib.load(os.path.join(model_dir, LABEL_ENCODER_FILE)),
+        feature_cols=joblib.load(os.path.join(model_dir, FEATURE_COLS_FILE)),
+    )
@@ -24,7 +24,8 @@ export default function AdminDashboard() {
   });
   const [risk, setRisk] = useState("");
   const [file, setFile] = useState(null);
-  const [bulkResult, setBulkResult] = useState([]);
+  const [bulkResult, setBulkResult] = useState(null);
+  const [bulkProgress, setBulkProgress] = useState(null);
 
   const [userForm, setUserForm] = useState({
     username: "",
@@ -97,6 +98,31 @@ export default function AdminDashboard() {
     }
   };
 
+  const pollBulkJob = async (jobId) => {
+    try {
+      const progress = await axios.get(
+        `http://localhost:8000/admin/admin/jobs/${jobId}/progress`
+      );
+      setBulkProgress(progress.data);
+      if (progress.data.status === "queued" || progress.data.status === "running") {
+        setTimeout(() => pollBulkJob(jobId), 1000);
+        return;
+      }
+      const job = await axios.get(`http://localhost:8000/admin/admin/jobs/${jobId}`);
+      if (job.data.status === "completed") {
+        setBulkResult(job.data.result);
+        alert("Bulk upload finished!");
+      } else {
+        alert("Bulk upload failed: " + job.data.error);
+      }
+    } catch (error) {
+      alert(
+        "Error checking bulk upload: " +
+          (error.response?.data?.detail || error.message)
+      );
+    }
+  };
+
   const handleBulkUpload = async (e) => {
     e.preventDefault();
     if (!file) return alert("Please upload a file");
@@ -110,8 +136,8 @@ export default function AdminDashboard() {
           headers: { "Content-Type": "multipart/form-data" },
         }
       );
-      setBulkResult(res.data.data);
-      alert("Bulk upload successful!");
+      setBulkResult(null);
+      pollBulkJob(res.data.job_id);
     } catch (error) {
       alert(
         "Error uploading bulk data: " +
@@ -372,16 +398,31 @@ export default function AdminDashboard() {
                   />
                   <button onClick={handleBulkUpload}>Upload & Predict</button>
                 </div>
-                {bulkResult.length > 0 && (
+                {bulkProgress && bulkProgress.status !== "completed" && (
+                  <p>
+                    Upload {bulkProgress.status}: {bulkProgress.processed} rows processed
+                    {bulkProgress.percent !== null && ` (${bulkProgress.percent}%)`}
+                  </p>
+                )}
+                {bulkResult && (
                   <div>
-                    <h5>Uploaded Drugs</h5>
-                    <ul>
-                      {bulkResult.map((item, i) => (
-                        <li key={i}>
-                          {item.name} - Risk: {item.risk_level}
-                        </li>
-                      ))}
-                    </ul>
+                    <h5>Upload Summary</h5>
+                    <p>
+                      Rows: {bulkResult.total_rows} | Added: {bulkResult.added} |
+                      Skipped: {bulkResult.skipped}
+                    </p>
+                    {bulkResult.errors.length > 0 && (
+                      <ul>
+                        {bulkResult.errors.map((item, i) => (
+                          <li key={i}>
+                            Row {item.row}: {item.error}
+                          </li>
+                        ))}
+                      </ul>
+                    )}
+                    {bulkResult.errors_truncated && (
+                      <p>Only the first {bulkResult.errors.length} errors are shown.</p>
+                    )}
                   </div>
                 )}
               </div>